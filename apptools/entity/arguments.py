@@ -3,24 +3,51 @@ import pathlib
 
 from apptools.semver.arguments import parser as semver_parser
 
-parser = argparse.ArgumentParser(add_help=False, parents=[semver_parser])
-parser.add_argument("-i",
-                    "--input",
-                    help="Entity directory",
-                    required=True,
-                    type=pathlib.Path)
+# The arguments of all writers, except for the output which differs per
+# writer when writing to multiple targets at once.
+common_parser = argparse.ArgumentParser(add_help=False, parents=[semver_parser])
+common_parser.add_argument("-i",
+                           "--input",
+                           help="Entity directory",
+                           required=True,
+                           type=pathlib.Path)
+common_parser.add_argument("-f",
+                           "--force",
+                           help="Force code generation, even if logic files exist",
+                           required=False,
+                           action='store_true')
+common_parser.add_argument("-d",
+                           "--debug",
+                           help="Add debug info to generated code",
+                           required=False,
+                           action='store_true')
+common_parser.add_argument("-c",
+                           "--cache",
+                           help="Cache directory for parsed entities, reused by later runs",
+                           required=False,
+                           type=pathlib.Path)
+common_parser.add_argument("-j",
+                           "--jobs",
+                           help="Number of processes parsing the entity files",
+                           required=False,
+                           default=1,
+                           type=int)
+common_parser.add_argument("--incremental",
+                           help="Only regenerate the entities that changed since the previous run",
+                           required=False,
+                           action='store_true')
+common_parser.add_argument("--profile",
+                           help="Write the time per phase and per entity to this JSON report",
+                           required=False,
+                           type=pathlib.Path)
+common_parser.add_argument("--profile-dump",
+                           help="Write the cProfile statistics of the run to this file",
+                           required=False,
+                           type=pathlib.Path)
+
+parser = argparse.ArgumentParser(add_help=False, parents=[common_parser])
 parser.add_argument("-o",
                     "--output",
                     help="Output directory",
                     required=True,
                     type=pathlib.Path)
-parser.add_argument("-f",
-                    "--force",
-                    help="Force code generation, even if logic files exist",
-                    required=False,
-                    action='store_true')
-parser.add_argument("-d",
-                    "--debug",
-                    help="Add debug info to generated code",
-                    required=False,
-                    action='store_true')
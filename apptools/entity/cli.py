@@ -7,8 +7,9 @@ import sys
 from typing import Mapping, Callable, List
 
 from apptools.entity.arguments import parser as parent_parser
+from apptools.entity.arguments import common_parser
 
-from apptools.entity.writer import write
+from apptools.entity.writer import write, write_all
 from apptools.entity.java.writer import write as java_write
 from apptools.entity.kotlin.writer import write as kotlin_write
 from apptools.entity.swift.writer import write as swift_write
@@ -16,6 +17,22 @@ from apptools.entity.typescript.writer import write as typescript_write
 
 description = "Transform entities to models in n programming languages"
 
+writers = {
+    "java": java_write,
+    "kotlin": kotlin_write,
+    "swift": swift_write,
+    "typescript": typescript_write,
+}
+
+
+def target(raw: str):
+    name, _, output = raw.partition(":")
+    if name not in writers or not output:
+        raise argparse.ArgumentTypeError(
+            f"Invalid target {raw}, expected writer:output with a writer of {', '.join(writers)}")
+
+    return writers[name], pathlib.Path(output)
+
 
 def main():
     parser = argparse.ArgumentParser(allow_abbrev=False,
@@ -35,8 +52,20 @@ def main():
                                               parents=[parent_parser])
     typescript_parser.set_defaults(writer=typescript_write)
 
+    all_parser = subparsers.add_parser(name="all", parents=[common_parser])
+    all_parser.add_argument("-t",
+                            "--target",
+                            help="Writer and its output directory, eg. swift:../ios/App",
+                            required=True,
+                            action="append",
+                            type=target)
+    all_parser.set_defaults(writer=None)
+
     args = parser.parse_args()
 
+    if args.writer is None:
+        sys.exit(write_all(args.target, vars(args)))
+
     sys.exit(write(args.writer, vars(args)))
 
 
@@ -0,0 +1,81 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from apptools.entity.navajo import Entity, Message
+
+# An ordered set of entities, a dict keeps the order of insertion.
+Dependencies = Dict[Entity, None]
+
+
+# dependencies of an entity
+# - the direct parent logic file (for extends) "A extends B"
+
+# - the logic file itself (in case of inner classes)
+#   - parent logic files of inner classes
+
+# - all (in)direct top level nonnull messages that extend an entity and keep same name (for constructor) A(X x){super(x)}
+@lru_cache(maxsize=None)
+def get_dependencies(entity: Entity, logic: bool = False) -> Tuple[Entity, ...]:
+    """The entities an entity depends on, in order and without duplicates."""
+    dependencies: Dependencies = {}
+    for extends in entity.root.extends:
+        dependencies[extends] = None
+        dependencies.update(_get_constructor_dependencies(extends))
+
+    dependencies.update(_get_variable_dependencies(entity, entity.root, logic))
+
+    return tuple(dependencies)
+
+
+# Memoized, the returned dependencies are shared and must not be modified.
+@lru_cache(maxsize=None)
+def _get_constructor_dependencies(entity: Entity) -> Dependencies:
+    dependencies: Dependencies = {}
+    if len(entity.root.extends) == 1:
+        dependencies.update(_get_constructor_dependencies(entity.root.extends[0]))
+
+    for message in entity.root.messages:
+        if message.nullable:
+            continue
+        if len(message.extends) == 1 and not message.is_non_empty:
+            dependencies[message.extends[0]] = None
+        else:
+            # an inner class or shared interface of the entity itself
+            dependencies[entity] = None
+    return dependencies
+
+
+@lru_cache(maxsize=None)
+def _get_variable_dependencies(entity: Entity, root: Message, logic: bool = False) -> Dependencies:
+    dependencies: Dependencies = {}
+    for message in root.messages:
+        if message.nullable and logic:
+            continue
+
+        if message.extends:
+            for extends in message.extends:
+                dependencies[extends] = None
+                if message.is_non_empty:
+                    # we will have an inner class for this variable
+                    dependencies[entity] = None
+                dependencies.update(_get_constructor_dependencies(extends))
+            if len(message.extends) > 1:
+                dependencies[entity] = None
+        else:
+            # we will have an inner class for this variable
+            if not logic:
+                dependencies[entity] = None
+        for submessage in message.messages:
+            if submessage.nullable and logic:
+                continue
+            if submessage.extends:
+                for extends in submessage.extends:
+                    dependencies[extends] = None
+                    if extends.name != submessage.name and submessage.is_non_empty:
+                        dependencies.update(_get_variable_dependencies(extends, extends.root, logic))
+                        dependencies.update(_get_variable_dependencies(extends, submessage, logic))
+                if len(submessage.extends) > 1:
+                    dependencies[entity] = None
+            else:
+                dependencies.update(_get_variable_dependencies(entity, submessage, logic))
+    return dependencies
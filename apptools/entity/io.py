@@ -1,4 +1,27 @@
-import os, io
+import os, io, hashlib, shutil
+
+from contextlib import contextmanager
+
+from apptools.entity.profiling import phase
+
+# Lists collecting the paths of the files written, see recording().
+_recordings = []
+
+# The files actually (re)written and the ones that already had the
+# generated content, which are left untouched to keep their mtime.
+statistics = {"written": 0, "unchanged": 0}
+
+
+@contextmanager
+def recording():
+    """Collect the paths of all files written by IndentedWriter within the
+    context."""
+    outputs = []
+    _recordings.append(outputs)
+    try:
+        yield outputs
+    finally:
+        _recordings.remove(outputs)
 
 
 class IndentedWriter(object):
@@ -8,16 +31,34 @@ class IndentedWriter(object):
         self.indentation = " " * indent
 
     def __enter__(self):
-        if self.path is not None:
-            self.fp = open(self.path, "w")
-        else:
-            self.fp = io.StringIO("")
+        # Files are generated in memory first, see __exit__.
+        self.fp = io.StringIO("")
 
         return self
 
-    def __exit__(self, *args):
+    def __exit__(self, exc_type, *args):
+        if self.path is not None and exc_type is None:
+            with phase("io"):
+                self._save(self.fp.getvalue().encode())
+            for outputs in _recordings:
+                outputs.append(self.path)
+
         self.fp.close()
 
+    def _save(self, content: bytes):
+        if _is_unchanged(self.path, content):
+            statistics["unchanged"] += 1
+            return
+
+        # Replace the file at once, so it is never seen half written.
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fp:
+            fp.write(content)
+        if os.path.exists(self.path):
+            shutil.copymode(self.path, tmp)
+        os.replace(tmp, self.path)
+        statistics["written"] += 1
+
     def indented(self, indent: int = 4):
         writer = IndentedWriter(self.path, self.indent + indent)
         writer.fp = self.fp
@@ -40,3 +81,16 @@ class IndentedWriter(object):
 
     def append(self, text: str):
         self.fp.write(text)
+
+
+def _is_unchanged(path: os.PathLike, content: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(content):
+            return False
+
+        with open(path, "rb") as fp:
+            existing = fp.read()
+    except OSError:
+        return False
+
+    return hashlib.sha256(existing).digest() == hashlib.sha256(content).digest()
@@ -28,11 +28,8 @@ def _write_entity(entity: Entity, output: pathlib.Path, package: str) -> None:
     datamodel = output / entity.package / "datamodel"
     datamodel.mkdir(parents=True, exist_ok=True)
     datamodel_class = datamodel / f"{entity.name}Entity.java"
-    import_list = None
     with IndentedWriter(path=datamodel_class) as writer:
-        import_list = _write_datamodel(writer, entity, output, package, None)
-    with IndentedWriter(path=datamodel_class) as writer:
-        _write_datamodel(writer, entity, output, package, import_list)
+        _write_datamodel(writer, entity, output, package)
 
     logic = output / entity.package / "logic"
     logic.mkdir(parents=True, exist_ok=True)
@@ -157,31 +154,31 @@ def _write_service(writer: IndentedWriter, entity: Entity,
 
 
 def _write_datamodel(writer: IndentedWriter, entity: Entity,
-                     output: pathlib.Path, package: str, import_list: Set) -> None:
+                     output: pathlib.Path, package: str) -> None:
     writer.writeln(f"package {package}.{_package(entity.package)}.datamodel;")
 
     writer.newline()
 
-    if import_list is not None:
-        import_list.update({
-            "java.io.Serializable"
-        })
+    # The classes add the imports they need, so they are written to a buffer
+    # that follows the imports.
+    with IndentedWriter(path=None) as body_writer:
+        import_list = _write_datamodel_class(body_writer, entity.root, set())
+        body = body_writer.fp.getvalue()
 
-        for dependency in _get_dependencies(entity):
-            import_list.add(f"{package}.{_package(dependency.package)}.logic." +
-                               dependency.name)
+    import_list.update({
+        "java.io.Serializable"
+    })
 
+    for dependency in _get_dependencies(entity):
+        import_list.add(f"{package}.{_package(dependency.package)}.logic." +
+                           dependency.name)
 
-        for import_item in sorted(import_list):
-            writer.writeln(f"import {import_item};")
-    else:
-        import_list = set()
+    for import_item in sorted(import_list):
+        writer.writeln(f"import {import_item};")
 
     writer.newline()
 
-    import_list = _write_datamodel_class(writer, entity.root, import_list)
-
-    return import_list
+    writer.append(body)
 
 
 def _write_datamodel_class(writer: IndentedWriter,
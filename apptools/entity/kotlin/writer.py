@@ -1,9 +1,12 @@
 import pathlib
 
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Set
 
 from apptools.entity.navajo import Entity, Message
+from apptools.entity.dependencies import get_dependencies
 from apptools.entity.io import IndentedWriter
+from apptools.entity.lowering import Field, Kind, lower
 from apptools.entity.text import camelcase
 
 debug = False
@@ -58,11 +61,8 @@ def _write_entity(entity: Entity, output: pathlib.Path, package: str, force: boo
     datamodel = output / entity.package / "datamodel"
     datamodel.mkdir(parents=True, exist_ok=True)
     datamodel_class = datamodel / f"{entity.name}Entity.kt"
-    import_list = None
     with IndentedWriter(path=datamodel_class) as writer:
-        import_list = _write_datamodel(writer, entity, output, package, None)
-    with IndentedWriter(path=datamodel_class) as writer:
-        _write_datamodel(writer, entity, output, package, import_list)
+        _write_datamodel(writer, entity, output, package)
 
 
     logic = output / entity.package / "logic"
@@ -93,7 +93,7 @@ def _write_service(writer: IndentedWriter, entity: Entity,
     if "GET" in entity.methods or "PUT" in entity.methods or "POST" in entity.methods or "DELETE" in entity.methods:
         dependencies.add(
             f"{package}.{_package(entity.package)}.logic.{entity.name}")
-    for dependency in _get_dependencies(entity):
+    for dependency in get_dependencies(entity):
         dependencies.add(f"{package}.{_package(dependency.package)}.logic." + dependency.name)
 
     for dependency in sorted(dependencies):
@@ -190,35 +190,35 @@ def _write_service_typeadapterfactories(writer: IndentedWriter, message: Message
 
 
 def _write_datamodel(writer: IndentedWriter, entity: Entity,
-                     output: pathlib.Path, package: str, import_list: Set) -> None:
+                     output: pathlib.Path, package: str) -> None:
     writer.writeln(f"package {package}.{_package(entity.package)}.datamodel")
 
     writer.newline()
 
-    if import_list is not None:
-        import_list.update({
-            "java.io.Serializable",
-            "com.sendrato.app.sdk.datamodel.Entity",
-            f"{package}.{_package(entity.package)}.logic.{entity.name}"
-        })
+    # The classes add the imports they need, so they are written to a buffer
+    # that follows the imports.
+    with IndentedWriter(path=None) as body_writer:
+        import_list = _write_datamodel_inner(body_writer, entity.root, set())
+        body = body_writer.fp.getvalue()
 
-        for dependency in _get_dependencies(entity):
-            import_list.add(f"{package}.{_package(dependency.package)}.logic." +
-                               dependency.name)
-            import_list.add(f"{package}.{_package(dependency.package)}.datamodel." +
-                               dependency.name + "Entity")
+    import_list.update({
+        "java.io.Serializable",
+        "com.sendrato.app.sdk.datamodel.Entity",
+        f"{package}.{_package(entity.package)}.logic.{entity.name}"
+    })
 
+    for dependency in get_dependencies(entity):
+        import_list.add(f"{package}.{_package(dependency.package)}.logic." +
+                           dependency.name)
+        import_list.add(f"{package}.{_package(dependency.package)}.datamodel." +
+                           dependency.name + "Entity")
 
-        for import_item in sorted(import_list):
-            writer.writeln(f"import {import_item}")
-    else:
-        import_list = set()
+    for import_item in sorted(import_list):
+        writer.writeln(f"import {import_item}")
 
     writer.newline()
 
-    import_list = _write_datamodel_inner(writer, entity.root, import_list)
-
-    return import_list
+    writer.append(body)
 
 def _write_datamodel_inner(writer: IndentedWriter,
                            message: Message,
@@ -537,7 +537,7 @@ def _write_logic(writer: IndentedWriter, entity: Entity, package: str) -> None:
         f"{package}.{_package(entity.package)}.datamodel.{entity.name}Entity"
     ]
 
-    for dependency in _get_dependencies(entity, False): # set this to True to reduce imports, but will give false negatives at the moment
+    for dependency in get_dependencies(entity, False): # set this to True to reduce imports, but will give false negatives at the moment
         import_list.append(f"{package}.{_package(dependency.package)}.logic." +
                            dependency.name)
         import_list.append(f"{package}.{_package(dependency.package)}.datamodel." + dependency.name + "Entity")
@@ -720,208 +720,60 @@ def _write_logic_class(writer: IndentedWriter, message: Message, shared_interfac
         indented_writer.writeln("}")
         writer.writeln("}")
     
+@lru_cache(maxsize=None)
 def _get_shared_interface(message: Message) -> SharedInterface:
     variables = []
-    enums = []
-
-    for property in message.properties:
-        if property.method == "request":
-            continue
-
-        type = property.type
-        name = property.name
-        variable_name = camelcase(name)
-        variable_type = _kotlin_type(type)
-        nullable = property.nullable
-
-        if property.enum:
-            variable_type = message.name + "Entity." + name
-            enum_options = []
-            for enum_value in property.enum:
-                enum_options.append(enum_value)
-            enums.append((name, enum_options))
-            # assert False, "This is not supported, because of Swift :-("
-        if nullable:
-            variable_type += "?"
-        variables.append(Variable(name, variable_name, variable_type, True, nullable))
+    lowered = lower(message)
 
-    for submessage in message.messages:
-        name = submessage.name
-        nullable = submessage.nullable
-
-        if submessage.is_array:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                # assert False, "This is not supported, because of Swift :-("
-                variable_type = "MutableList<" + submessage.name + ">"
-            elif len(submessage.extends) == 1:
-                variable_type = "MutableList<" + submessage.extends[0].name + ">"
-            else:
-                variable_type = "MutableList<" + submessage.name + ">"
-                # assert False, "This is not supported, because of Swift :-("
-            variable_name = camelcase(name) + "List"
+    for field in lowered.fields:
+        if field.kind == Kind.PROPERTY and field.enum:
+            variable_type = message.name + "Entity." + field.network_name
         else:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                variable_type = submessage.name
-                # assert False, f"This is not supported, because of Swift :-("
-            elif len(submessage.extends) == 1:
-                variable_type = submessage.extends[0].name
-            else:
-                variable_type = submessage.name
-                # assert False, "This is not supported, because of Swift :-("
-            variable_name = camelcase(name)
-
-        if nullable:
+            variable_type = _variable_type(field, "")
+        if field.nullable:
             variable_type += "?"
-        variables.append(Variable(name, variable_name, variable_type, False, nullable))
-    return SharedInterface(message.name, variables, [], enums)
+        variables.append(Variable(field.network_name, field.name, variable_type, field.kind == Kind.PROPERTY, field.nullable))
+    return SharedInterface(message.name, variables, [], lowered.enums)
 
+# Memoized, the returned lists are shared and must not be modified.
+@lru_cache(maxsize=None)
 def _get_variables(message: Message, prefix: str, recursive: bool = False):
     nonnull_variables = []
     nullable_variables = []
-    enums = []
-    inner_classes = [] 
-
-    for property in message.properties:
-        if property.method == "request":
-            continue
-
-        type = property.type
-        name = property.name
-        variable_name = camelcase(name)
-        variable_type = _kotlin_type(type)
-        variable_type_primitive = True
-        nullable = property.nullable
-
-        if property.enum:
-            enum_options = []
-            for enum_value in property.enum:
-                enum_options.append(enum_value)
-            enums.append((name, enum_options))
-            variable_type = name
-        if nullable:
-            variable_type += "?"
-            nullable_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable))
-        else:
-            nonnull_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable))
-
-    for submessage in message.messages:
-        name = submessage.name
-        nullable = submessage.nullable
-        variable_type_primitive = False
-        if submessage.is_array:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                # inner class
-                inner_classes.append((submessage, prefix))
-                variable_type = "MutableList<" + prefix + name + ">"
-            elif len(submessage.extends) == 1:
-                # external class
-                variable_type = "MutableList<" + submessage.extends[0].name + ">"
-            else:
-                inner_classes.append((submessage, prefix))
-                variable_type = "MutableList<" + prefix + submessage.name + ">"
-            variable_name = camelcase(name) + "List"
-        else:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                inner_classes.append((submessage, prefix))
-                variable_type = prefix + name
-            elif len(submessage.extends) == 1:
-                variable_type = submessage.extends[0].name
-            else:
-                inner_classes.append((submessage, prefix))
-                variable_type = prefix + submessage.name
-            variable_name = camelcase(name)
+    lowered = lower(message)
+    enums = lowered.enums
+    inner_classes = [(submessage, prefix) for submessage in lowered.inner_messages]
 
-        if nullable:
+    for field in lowered.fields:
+        variable_type = _variable_type(field, prefix)
+        if field.nullable:
             variable_type += "?"
-            nullable_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable))
+            nullable_variables.append(Variable(field.network_name, field.name, variable_type, field.kind == Kind.PROPERTY, field.nullable))
         else:
-            nonnull_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable))
-    
+            nonnull_variables.append(Variable(field.network_name, field.name, variable_type, field.kind == Kind.PROPERTY, field.nullable))
+
     if recursive:
         if len(message.extends) == 1:
             result = _get_variables(message.extends[0].root, prefix, recursive)
             nonnull_variables = result[0] + nonnull_variables
-            nullable_variables += result[1] + nullable_variables
-            enums += result[2]
+            nullable_variables = result[1] + nullable_variables
+            enums = enums + result[2]
             inner_classes += result[3]
 
     return nonnull_variables, nullable_variables, enums, inner_classes
 
-# dependencies of an entity
-# - the direct parent logic file (for extends) "A extends B"
-
-# - the logic file itself (in case of inner classes)
-#   - parent logic files of inner classes
-
-# - all (in)direct top level nonnull messages that extend an entity and keep same name (for constructor) A(X x){super(x)}
-def _get_constructor_dependencies(entity: Entity):
-    dependencies = []
-    if len(entity.root.extends) == 1:
-        dependencies += _get_constructor_dependencies(entity.root.extends[0])
+def _variable_type(field: Field, prefix: str) -> str:
+    if field.kind == Kind.PROPERTY:
+        return field.network_name if field.enum else _kotlin_type(field.type)
 
-    for message in entity.root.messages:
-        if message.nullable:
-            continue
-        if len(message.extends) == 1:
-            if message.is_non_empty:
-                dependencies.append(entity)
-            else:
-                dependencies.append(message.extends[0])
-        elif len(message.extends) > 1:
-            shared_interface = _get_shared_interface(entity.root)
-            for parent in shared_interface.parents:
-                dependencies.add(parent)
-        else:
-            dependencies.append(entity)
-    return dependencies
-
-def _get_variable_dependencies(entity: Entity, root: Message, logic: bool = False):
-    dependencies = []
-    for message in root.messages:
-        if message.nullable and logic:
-            continue
-        
-        if message.extends:
-            for extends in message.extends:
-                if message.is_non_empty:
-                    # we will have an inner class for this variable
-                    dependencies.append(extends)
-                    dependencies.append(entity)
-                else:                    
-                    dependencies.append(extends)
-                dependencies += _get_constructor_dependencies(extends)
-            if len(message.extends) > 1:
-                dependencies.append(entity)
-        else:
-            # we will have an inner class for this variable
-            if not logic:
-                dependencies.append(entity)
-        for submessage in message.messages:
-            if submessage.nullable and logic:
-                continue
-            if submessage.extends:
-                for extends in submessage.extends:
-                    dependencies.append(extends)
-                    if extends.name != submessage.name and submessage.is_non_empty:
-                        dependencies += _get_variable_dependencies(extends, extends.root, logic)
-                        dependencies += _get_variable_dependencies(extends, submessage, logic)
-                if len(submessage.extends) > 1:
-                    dependencies.append(entity)
-            else:
-                dependencies += _get_variable_dependencies(entity, submessage, logic)
-    return dependencies
-
-
-def _get_dependencies(entity: Entity, logic: bool = False):
-    dependencies = []
-    if entity.root.extends:
-        for extends in entity.root.extends:
-            dependencies.append(extends)
-            dependencies += _get_constructor_dependencies(extends)
-
-    dependencies += _get_variable_dependencies(entity, entity.root, logic)
+    if field.kind == Kind.EXTERNAL:
+        variable_type = field.extends.name
+    else:
+        variable_type = prefix + field.message.name
 
-    return dependencies
+    if field.is_array:
+        return "MutableList<" + variable_type + ">"
+    return variable_type
 
 
 def _package(path: pathlib.Path, start: str = None) -> str:
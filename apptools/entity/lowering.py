@@ -0,0 +1,100 @@
+from enum import Enum, unique
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from apptools.entity.navajo import Entity, Message
+from apptools.entity.text import camelcase
+
+
+@unique
+class Kind(Enum):
+    # A property of the message.
+    PROPERTY = 1
+    # A sub message with a class of its own, inside the class of the message.
+    INNER = 2
+    # A sub message that is just the one entity it extends.
+    EXTERNAL = 3
+    # A sub message extending multiple entities, with an inner interface
+    # shared by a class per extended entity.
+    SHARED = 4
+
+
+class Field(object):
+    def __init__(self, network_name: str, name: str, kind: Kind,
+                 nullable: bool, type: Optional[str] = None,
+                 enum: Optional[List[str]] = None,
+                 message: Optional[Message] = None):
+        super().__init__()
+
+        self.network_name = network_name
+        self.name = name
+        self.kind = kind
+        self.nullable = nullable
+        # The entity type and enum cases of a property.
+        self.type = type
+        self.enum = enum
+        # The sub message of any other kind.
+        self.message = message
+
+    @property
+    def is_array(self) -> bool:
+        return self.message is not None and self.message.is_array
+
+    @property
+    def extends(self) -> Entity:
+        return self.message.extends[0]
+
+
+class Lowered(object):
+    """The language independent variables of a message, which the writers
+    only have to translate to their own types."""
+
+    def __init__(self, fields: List[Field], enums: List[Tuple[str, List[str]]],
+                 inner_messages: List[Message]):
+        super().__init__()
+
+        self.fields = fields
+        self.enums = enums
+        self.inner_messages = inner_messages
+
+
+@lru_cache(maxsize=None)
+def lower(message: Message) -> Lowered:
+    """Lower a message once, the result is shared by all its uses."""
+    fields: List[Field] = []
+    enums: List[Tuple[str, List[str]]] = []
+    inner_messages: List[Message] = []
+
+    for property in message.properties:
+        if property.method == "request":
+            continue
+
+        name = property.name
+        if property.enum:
+            enums.append((name, list(property.enum)))
+
+        fields.append(Field(name, camelcase(name), Kind.PROPERTY,
+                            property.nullable, type=property.type,
+                            enum=property.enum))
+
+    for submessage in message.messages:
+        name = submessage.name
+
+        if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
+            kind = Kind.INNER
+        elif len(submessage.extends) == 1:
+            kind = Kind.EXTERNAL
+        else:
+            kind = Kind.SHARED
+
+        if kind != Kind.EXTERNAL:
+            inner_messages.append(submessage)
+
+        variable_name = camelcase(name)
+        if submessage.is_array:
+            variable_name += "List"
+
+        fields.append(Field(name, variable_name, kind, submessage.nullable,
+                            message=submessage))
+
+    return Lowered(fields, enums, inner_messages)
@@ -0,0 +1,162 @@
+import cProfile
+import json
+import os
+import pathlib
+import pstats
+import time
+
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from apptools.config import config
+
+# The number of entities and functions listed in the report.
+_TOP = 20
+
+# Wall and CPU time in seconds.
+Times = Dict[str, float]
+
+
+class Profile(object):
+    """Wall and CPU time per phase and per entity. Phases nest, the time of
+    an inner phase only counts for the inner phase."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.phases: Dict[str, Times] = {}
+        self.entities: Dict[str, Dict[str, Times]] = {}
+        self.stack: List[Tuple[str, Optional[str]]] = []
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.start = (self.wall, self.cpu)
+
+    def charge(self) -> None:
+        """Charge the time since the previous charge to the current phase."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self.stack:
+            phase, entity = self.stack[-1]
+            _add(self.phases.setdefault(phase, _times()), wall - self.wall, cpu - self.cpu)
+            if entity is not None:
+                _add(self.entities.setdefault(entity, {}).setdefault(phase, _times()),
+                     wall - self.wall, cpu - self.cpu)
+        self.wall, self.cpu = wall, cpu
+
+    def report(self, stats: pstats.Stats) -> Dict[str, Any]:
+        self.charge()
+        total = _times()
+        _add(total, self.wall - self.start[0], self.cpu - self.start[1])
+
+        phases = dict(self.phases)
+        other = _times()
+        _add(other, total["wall"] - sum(times["wall"] for times in phases.values()),
+             total["cpu"] - sum(times["cpu"] for times in phases.values()))
+        phases["other"] = other
+
+        entities = []
+        for name, entity_phases in self.entities.items():
+            entity = _times()
+            for times in entity_phases.values():
+                _add(entity, times["wall"], times["cpu"])
+            entities.append({"entity": name, **entity, "phases": entity_phases})
+        entities.sort(key=lambda entity: entity["wall"], reverse=True)
+
+        return {
+            "version": config.VERSION,
+            "total": _rounded(total),
+            "phases": {name: _rounded(times) for name, times in phases.items()},
+            "entities": [
+                {**entity, **_rounded(entity), "phases": {
+                    name: _rounded(times) for name, times in entity["phases"].items()
+                }}
+                for entity in entities[:_TOP]
+            ],
+            "functions": _functions(stats),
+        }
+
+
+# The profile of the current run, if any, see profiling().
+_profile: Optional[Profile] = None
+
+
+def is_profiling() -> bool:
+    return _profile is not None
+
+
+@contextmanager
+def phase(name: str, entity: Optional[str] = None):
+    """Time the context as the given phase, for the given entity or else for
+    the entity of the enclosing phase. Does nothing unless profiling."""
+    if _profile is None:
+        yield
+        return
+
+    if entity is None and _profile.stack:
+        entity = _profile.stack[-1][1]
+
+    _profile.charge()
+    _profile.stack.append((name, entity))
+    try:
+        yield
+    finally:
+        _profile.charge()
+        _profile.stack.pop()
+
+
+@contextmanager
+def profiling(report: Optional[pathlib.Path], dump: Optional[pathlib.Path] = None):
+    """Profile the context if a report and/or a cProfile dump is requested."""
+    global _profile
+
+    if report is None and dump is None:
+        yield
+        return
+
+    _profile = Profile()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profile, _profile = _profile, None
+
+        if dump is not None:
+            profiler.dump_stats(dump)
+            print(f"Wrote cProfile dump to {dump}")
+        if report is not None:
+            with open(report, "w") as fp:
+                json.dump(profile.report(pstats.Stats(profiler)), fp, indent=2)
+            print(f"Wrote profile to {report}")
+
+
+def _functions(stats: pstats.Stats) -> List[Dict[str, Any]]:
+    """The functions generating the code with the highest cumulative time,
+    the reading of the entities is covered by the phases already."""
+    directory = os.path.dirname(__file__)
+    functions = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        module = os.path.relpath(filename, directory)
+        if module.startswith("..") or module in ("writer.py", "profiling.py"):
+            continue
+        functions.append({
+            "function": f"{module}:{line}({name})",
+            "calls": calls,
+            "total": round(total, 6),
+            "cumulative": round(cumulative, 6),
+        })
+    functions.sort(key=lambda function: function["cumulative"], reverse=True)
+    return functions[:_TOP]
+
+
+def _times() -> Times:
+    return {"wall": 0.0, "cpu": 0.0}
+
+
+def _add(times: Times, wall: float, cpu: float) -> None:
+    times["wall"] += wall
+    times["cpu"] += cpu
+
+
+def _rounded(times: Times) -> Times:
+    return {"wall": round(times["wall"], 6), "cpu": round(times["cpu"], 6)}
@@ -1,10 +1,12 @@
 import pathlib
 import os
 
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Set
 
 from apptools.entity.navajo import Entity, Message, Property
 from apptools.entity.io import IndentedWriter
+from apptools.entity.lowering import Field, Kind, lower
 from apptools.entity.text import camelcase, capitalize
 
 reserved_words = [
@@ -1006,203 +1008,62 @@ def _write_service_delete(writer: IndentedWriter,
 
     writer.writeln(f"}}")
 
+@lru_cache(maxsize=None)
 def _get_shared_interface(message: Message, prefix: str) -> SharedInterface:
     variables = []
-    enums = []
+    lowered = lower(message)
 
-    for property in message.properties:
-        if property.method == "request":
-            continue
-
-        type = property.type
-        name = property.name
-        variable_name = camelcase(name)
-        variable_type = _swift_type(type)
-        nullable = property.nullable
-
-        if property.enum:
-            variable_type = (prefix + message.name + "Entity" + name).replace(".", "")
-            enum_options = []
-            for enum_value in property.enum:
-                enum_options.append(enum_value)
-            enums.append((name, enum_options))
-        if nullable:
-            variable_type += "?"
-        variables.append(Variable(name, variable_name, variable_type, True, nullable, None))
-
-    for submessage in message.messages:
-        name = submessage.name
-        nullable = submessage.nullable
-
-        if submessage.is_array:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                variable_type = "[" + submessage.name + "]"
-            elif len(submessage.extends) == 1:
-                variable_type = "[" + submessage.extends[0].name + "]"
-            else:
-                variable_type = "[" + submessage.name + "]"
-            variable_name = camelcase(name) + "List"
+    for field in lowered.fields:
+        if field.kind == Kind.PROPERTY and field.enum:
+            variable_type = (prefix + message.name + "Entity" + field.network_name).replace(".", "")
         else:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                variable_type = submessage.name
-            elif len(submessage.extends) == 1:
-                variable_type = submessage.extends[0].name
-            else:
-                variable_type = submessage.name
-            variable_name = camelcase(name)
-
-        if nullable:
+            variable_type = _variable_type(field, "")
+        if field.nullable:
             variable_type += "?"
-        variables.append(Variable(name, variable_name, variable_type, False, nullable, submessage))
-    return SharedInterface(message.name, variables, [], enums)
+        variables.append(Variable(field.network_name, field.name, variable_type, field.kind == Kind.PROPERTY, field.nullable, field.message))
+    return SharedInterface(message.name, variables, [], lowered.enums)
 
+# Memoized, the returned lists are shared and must not be modified.
+@lru_cache(maxsize=None)
 def _get_variables(message: Message, prefix: str, recursive: bool = False):
     nonnull_variables = []
     nullable_variables = []
-    enums = []
-    inner_classes = [] 
-
-    for property in message.properties:
-        if property.method == "request":
-            continue
+    lowered = lower(message)
+    enums = lowered.enums
+    inner_classes = [(submessage, prefix) for submessage in lowered.inner_messages]
 
-        type = property.type
-        name = property.name
-        variable_name = camelcase(name)
-        variable_type = _swift_type(type)
-        variable_type_primitive = True
-        nullable = property.nullable
-
-        if property.enum:
-            enum_options = []
-            for enum_value in property.enum:
-                enum_options.append(enum_value)
-            enums.append((name, enum_options))
-            variable_type = name
-        if nullable:
+    for field in lowered.fields:
+        variable_type = _variable_type(field, prefix)
+        if field.nullable:
             variable_type += "?"
-            nullable_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable, None))
-        else:
-            nonnull_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable, None))
-
-    for submessage in message.messages:
-        name = submessage.name
-        nullable = submessage.nullable
-        variable_type_primitive = False
-        if submessage.is_array:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                # inner class
-                inner_classes.append((submessage, prefix))
-                variable_type = ("[" + prefix + name + "]")
-            elif len(submessage.extends) == 1:
-                # external class
-                variable_type = "[" + submessage.extends[0].name + "]"
-            else:
-                inner_classes.append((submessage, prefix))
-                variable_type = ("[" + prefix + submessage.name + "]").replace(".", "")
-            variable_name = camelcase(name) + "List"
+            nullable_variables.append(Variable(field.network_name, field.name, variable_type, field.kind == Kind.PROPERTY, field.nullable, field.message))
         else:
-            if not submessage.extends or (len(submessage.extends) == 1 and (submessage.properties or submessage.messages)):
-                inner_classes.append((submessage, prefix))
-                variable_type = (prefix + name)
-            elif len(submessage.extends) == 1:
-                variable_type = submessage.extends[0].name
-            else:
-                inner_classes.append((submessage, prefix))
-                variable_type = (prefix + submessage.name).replace(".", "")
-            variable_name = camelcase(name)
+            nonnull_variables.append(Variable(field.network_name, field.name, variable_type, field.kind == Kind.PROPERTY, field.nullable, field.message))
 
-        if nullable:
-            variable_type += "?"
-            nullable_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable, submessage))
-        else:
-            nonnull_variables.append(Variable(name, variable_name, variable_type, variable_type_primitive, nullable, submessage))
-    
     if recursive:
         if len(message.extends) == 1:
             result = _get_variables(message.extends[0].root, prefix, recursive)
             nonnull_variables = result[0] + nonnull_variables
-            nullable_variables += result[1] + nullable_variables
-            enums += result[2]
+            nullable_variables = result[1] + nullable_variables
+            enums = enums + result[2]
             inner_classes += result[3]
 
     return nonnull_variables, nullable_variables, enums, inner_classes
 
-# dependencies of an entity
-# - the direct parent logic file (for extends) "A extends B"
-
-# - the logic file itself (in case of inner classes)
-#   - parent logic files of inner classes
+def _variable_type(field: Field, prefix: str) -> str:
+    if field.kind == Kind.PROPERTY:
+        return field.network_name if field.enum else _swift_type(field.type)
 
-# - all (in)direct top level nonnull messages that extend an entity and keep same name (for constructor) A(X x){super(x)}
-def _get_constructor_dependencies(entity: Entity):
-    dependencies = []
-    if len(entity.root.extends) == 1:
-        dependencies += _get_constructor_dependencies(entity.root.extends[0])
-
-    for message in entity.root.messages:
-        if message.nullable:
-            continue
-        if len(message.extends) == 1:
-            if message.is_non_empty:
-                dependencies.append(entity)
-            else:
-                dependencies.append(message.extends[0])
-        elif len(message.extends) > 1:
-            shared_interface = _get_shared_interface(entity.root, '')
-            for parent in shared_interface.parents:
-                dependencies.add(parent)
-        else:
-            dependencies.append(entity)
-    return dependencies
-
-def _get_variable_dependencies(entity: Entity, root: Message, logic: bool = False):
-    dependencies = []
-    for message in root.messages:
-        if message.nullable and logic:
-            continue
-        
-        if message.extends:
-            for extends in message.extends:
-                if message.is_non_empty:
-                    # we will have an inner class for this variable
-                    dependencies.append(extends)
-                    dependencies.append(entity)
-                else:                    
-                    dependencies.append(extends)
-                dependencies += _get_constructor_dependencies(extends)
-            if len(message.extends) > 1:
-                dependencies.append(entity)
-        else:
-            # we will have an inner class for this variable
-            if not logic:
-                dependencies.append(entity)
-        for submessage in message.messages:
-            if submessage.nullable and logic:
-                continue
-            if submessage.extends:
-                for extends in submessage.extends:
-                    dependencies.append(extends)
-                    if extends.name != submessage.name and submessage.is_non_empty:
-                        dependencies += _get_variable_dependencies(extends, extends.root, logic)
-                        dependencies += _get_variable_dependencies(extends, submessage, logic)
-                if len(submessage.extends) > 1:
-                    dependencies.append(entity)
-            else:
-                dependencies += _get_variable_dependencies(entity, submessage, logic)
-    return dependencies
-
-
-def _get_dependencies(entity: Entity, logic: bool = False):
-    dependencies = []
-    if entity.root.extends:
-        for extends in entity.root.extends:
-            dependencies.append(extends)
-            dependencies += _get_constructor_dependencies(extends)
-
-    dependencies += _get_variable_dependencies(entity, entity.root, logic)
+    if field.kind == Kind.EXTERNAL:
+        variable_type = field.extends.name
+    else:
+        variable_type = prefix + field.message.name
 
-    return dependencies
+    if field.is_array:
+        variable_type = "[" + variable_type + "]"
+    if field.kind == Kind.SHARED:
+        variable_type = variable_type.replace(".", "")
+    return variable_type
 
 
 def _to_case(s: str) -> str:
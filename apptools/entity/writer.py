@@ -1,24 +1,283 @@
+import hashlib
+import json
+import os
 import pathlib
+import pickle
 import urllib.parse
 import xml.etree.ElementTree as ElementTree
 
-from typing import Callable, List, Any, NamedTuple, Dict, Optional, Set, MutableMapping, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, List, Any, NamedTuple, Dict, Optional, Set, MutableMapping, Mapping, Tuple
 from xml.etree.ElementTree import Element, XML
 
+from apptools.config import config
+from apptools.entity.io import recording, statistics
 from apptools.entity.navajo import Entity, Message, Property
+from apptools.entity.profiling import is_profiling, phase, profiling
 
 Options = Dict[str, Any]
 Writer = Callable[[List[Entity], Options], int]
+# A parsed message and the raw extends it has to be linked to.
+Link = Tuple[Message, str]
+
+
+class EntityCache(object):
+    """Entities by resolved source path, so that every entity file is parsed
+    once per run and entities that are extended multiple times are shared.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.entities: Dict[pathlib.Path, Entity] = {}
+        self.resolving: List[pathlib.Path] = []
+        # The resolved paths of all entities extended anywhere in an entity.
+        self.extends: Dict[pathlib.Path, List[pathlib.Path]] = {}
+        self.digests: Dict[pathlib.Path, Optional[str]] = {}
+        # Entities parsed ahead of time, whose extends are not linked yet.
+        self.parsed: Dict[pathlib.Path, Tuple[Entity, List[Link]]] = {}
+
+    def digest(self, path: pathlib.Path) -> Optional[str]:
+        if path not in self.digests:
+            try:
+                self.digests[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                self.digests[path] = None
+        return self.digests[path]
+
+    def key(self, path: pathlib.Path) -> Optional[str]:
+        """The content hash of an entity file combined with the keys of all
+        the entity files it extends (transitively).
+        """
+        digest = self.digest(path)
+        if digest is None or path not in self.extends:
+            return None
+
+        hash = hashlib.sha256(digest.encode())
+        for parent in self.extends[path]:
+            parent_key = self.key(parent)
+            if parent_key is None:
+                return None
+            hash.update(parent_key.encode())
+        return hash.hexdigest()
+
+    def load(self, directory: pathlib.Path, input: pathlib.Path) -> None:
+        """Reuse the entities of a previous run whose key is unchanged."""
+        try:
+            with open(directory / _CACHE_FILE, "rb") as fp:
+                content = pickle.load(fp)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Ignoring unreadable entity cache {directory}: {e}")
+            return
+
+        if content["version"] != config.VERSION or content["input"] != str(input):
+            return
+
+        # Take the recorded extends first, the keys depend on each other.
+        self.extends.update(content["extends"])
+        for path, (key, entity) in content["entities"].items():
+            if self.key(path) == key:
+                self.entities[path] = entity
+        for path in content["extends"]:
+            if path not in self.entities:
+                del self.extends[path]
+
+        print(f"Reusing {len(self.entities)} of {len(content['entities'])} cached entities")
+
+    def save(self, directory: pathlib.Path, input: pathlib.Path) -> None:
+        content = {
+            "version": config.VERSION,
+            "input": str(input),
+            "extends": self.extends,
+            "entities": {
+                path: (self.key(path), entity)
+                for path, entity in self.entities.items()
+            },
+        }
+
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / (_CACHE_FILE + ".tmp")
+        with open(tmp, "wb") as fp:
+            pickle.dump(content, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, directory / _CACHE_FILE)
+
+
+_CACHE_FILE = "entities.pickle"
+
+
+class Manifest(object):
+    """The entity keys and generated files of the previous run into an
+    output directory, used to only regenerate the entities that changed.
+    """
+
+    def __init__(self, directory: pathlib.Path, settings: Dict[str, Any]) -> None:
+        super().__init__()
+
+        self.directory = directory
+        self.settings = settings
+        # The outputs of an entity are relative to the directory.
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> None:
+        path = self.directory / _MANIFEST_FILE
+        try:
+            with open(path) as fp:
+                content = json.load(fp)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {path}: {e}")
+            return
+
+        # Other settings generate other code, so nothing can be reused.
+        if content.get("settings") == self.settings:
+            self.entries = content["entities"]
+
+    def save(self) -> None:
+        content = {"settings": self.settings, "entities": self.entries}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / (_MANIFEST_FILE + ".tmp")
+        with open(tmp, "w") as fp:
+            json.dump(content, fp, indent=2, sort_keys=True)
+        os.replace(tmp, self.directory / _MANIFEST_FILE)
+
+    def is_dirty(self, name: str, key: Optional[str]) -> bool:
+        entry = self.entries.get(name)
+        if key is None or entry is None or entry["key"] != key:
+            return True
+
+        return not all((self.directory / output).exists()
+                       for output in entry["outputs"])
+
+
+_MANIFEST_FILE = ".app-entity.json"
 
 
 def write(writer: Writer, options: Options) -> int:
+    with profiling(options.get("profile"), options.get("profile_dump")):
+        entities, keys = _read(options)
+
+        return _write(writer, entities, keys, options)
+
+
+def write_all(targets: List[Tuple[Writer, pathlib.Path]], options: Options) -> int:
+    """Write the entities with multiple writers, each to its own output, while
+    the entities are only read once."""
+    with profiling(options.get("profile"), options.get("profile_dump")):
+        entities, keys = _read(options)
+
+        if is_profiling():
+            # One after another, so that all targets end up in one profile.
+            statuses = [
+                _write(writer, entities, keys, {**options, "output": output})
+                for writer, output in targets
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=len(targets)) as executor:
+                futures = [
+                    executor.submit(_write, writer, entities, keys, {**options, "output": output})
+                    for writer, output in targets
+                ]
+                statuses = [future.result() for future in futures]
+
+    return next((status for status in statuses if status), None)
+
+
+def _read(options: Options) -> Tuple[List[Entity], Optional[Dict[str, Optional[str]]]]:
     input: pathlib.Path = options["input"]
 
+    cache = EntityCache()
+    cache_directory: Optional[pathlib.Path] = options.get("cache")
+    if cache_directory is not None:
+        with phase("cache"):
+            cache.load(cache_directory, input)
+
     # Find all entity files at the given input recursively.
-    paths = _api(input)
-    entities = _entities(input, paths)
+    with phase("discovery"):
+        paths = _api(input)
+    entities = _entities(input, paths, cache, options.get("jobs", 1))
+
+    if cache_directory is not None:
+        with phase("cache"):
+            cache.save(cache_directory, input)
+
+    if not options.get("incremental", False):
+        return entities, None
+
+    # The key of an entity covers its own file and every file it extends,
+    # which are the only files its generated code depends on. The entities
+    # are looked up by their file, not by their place in the list.
+    with phase("cache"):
+        keys = {
+            str(cache.entities[key].path): cache.key(key)
+            for key in (path.resolve() for path in paths)
+        }
+    return entities, keys
+
+
+def _write(writer: Writer, entities: List[Entity],
+           keys: Optional[Dict[str, Optional[str]]], options: Options) -> int:
+    written = statistics["written"]
+    unchanged = statistics["unchanged"]
+
+    if keys is not None:
+        status = _write_incremental(writer, entities, keys, options)
+    elif is_profiling():
+        # Entity by entity, to time each of them.
+        status = None
+        for entity in entities:
+            with phase("emit", str(entity.path)):
+                status = writer([entity], options) or status
+    else:
+        status = writer(entities, options)
+
+    print(f"Wrote {statistics['written'] - written} files, {statistics['unchanged'] - unchanged} unchanged in {options['output']}")
+
+    return status
+
+
+def _write_incremental(writer: Writer, entities: List[Entity],
+                       keys: Dict[str, Optional[str]], options: Options) -> int:
+    output: pathlib.Path = options["output"]
+
+    manifest = Manifest(output, {
+        "version": config.VERSION,
+        "writer": writer.__module__,
+        "force": options.get("force", False),
+        "debug": options.get("debug", False),
+    })
+    with phase("cache"):
+        manifest.load()
+
+    dirty = [
+        entity for entity in entities
+        if manifest.is_dirty(str(entity.path), keys[str(entity.path)])
+    ]
+    print(f"Regenerating {len(dirty)} of {len(entities)} entities")
+
+    status = None
+    for entity in dirty:
+        with recording() as outputs, phase("emit", str(entity.path)):
+            status = writer([entity], options) or status
+        manifest.entries[str(entity.path)] = {
+            "key": keys[str(entity.path)],
+            "outputs": sorted(set(
+                os.path.relpath(path, output) for path in outputs)),
+        }
 
-    return writer(entities, options)
+    # Forget the entities that are gone, their files are left alone.
+    for name in list(manifest.entries):
+        if name not in keys:
+            del manifest.entries[name]
+
+    with phase("cache"):
+        manifest.save()
+
+    return status
 
 
 def _api(input: pathlib.Path) -> set[pathlib.Path]:
@@ -32,22 +291,84 @@ def _api(input: pathlib.Path) -> set[pathlib.Path]:
     return paths
 
 
-def _entities(input: pathlib.Path, paths: set[pathlib.Path]) -> List[Entity]:
-    return [_entity(input, path) for path in paths]
+def _entities(input: pathlib.Path, paths: set[pathlib.Path],
+              cache: EntityCache, jobs: int = 1) -> List[Entity]:
+    ordered = sorted(paths)
+
+    if jobs > 1:
+        # Parsing is independent per file, only linking the extends needs
+        # all entities, so that is left to this process.
+        todo = [path for path in ordered if path.resolve() not in cache.entities]
+        chunksize = max(1, len(todo) // (jobs * 4))
+        with phase("parse"), ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_parse, repeat(input), todo, chunksize=chunksize)
+            for path, result in zip(todo, results):
+                cache.parsed[path.resolve()] = result
+
+    return [_entity(input, path, cache) for path in ordered]
+
+
+def _entity(input: pathlib.Path, path: pathlib.Path, cache: EntityCache) -> Entity:
+    key = path.resolve()
+    if key in cache.entities:
+        return cache.entities[key]
+
+    if key in cache.resolving:
+        raise ValueError("Cyclic extends: " + " -> ".join(
+            str(item) for item in cache.resolving[cache.resolving.index(key):] + [key]))
+
+    cache.resolving.append(key)
+    cache.extends[key] = []
+    name = str(_entity_path(input, path))
+    try:
+        if key in cache.parsed:
+            entity, links = cache.parsed.pop(key)
+        else:
+            with phase("parse", name):
+                entity, links = _parse(input, path)
+
+        with phase("link", name):
+            for message, extends_raw in links:
+                _link(input, path, message, extends_raw, cache)
+    finally:
+        cache.resolving.pop()
+
+    cache.entities[key] = entity
+
+    return entity
 
 
-def _entity(input: pathlib.Path, path: pathlib.Path) -> Entity:
+def _parse(input: pathlib.Path, path: pathlib.Path) -> Tuple[Entity, List[Link]]:
     element = ElementTree.parse(path).getroot()
     name = path.stem
     version = _version(name, element)
     root = _root(name, version, element)
     methods = _methods(element)
-    message = _message(input, path, root)
+    links: List[Link] = []
+    message = _message(root, links)
     package = _package(input, path, name)
 
+    return Entity(name, _entity_path(input, path), package, version, methods, message), links
+
+
+def _entity_path(input: pathlib.Path, path: pathlib.Path) -> pathlib.Path:
     entity_path = pathlib.Path(*path.parts[input.parts.index("entities") + 1:])
 
-    return Entity(name, "entity" / entity_path.with_suffix(''), package, version, methods, message)
+    return "entity" / entity_path.with_suffix('')
+
+
+def _link(input: pathlib.Path, path: pathlib.Path, message: Message,
+          extends_raw: str, cache: EntityCache) -> None:
+    for extends_item in extends_raw.split("^"):
+        extends = _extends(extends_item)
+        extension = pathlib.Path(*extends.path.parts)
+        dir = pathlib.Path(*input.parts[:input.parts.index("entities")])
+        parent_path = dir / "entities" / (str(extension) + ".xml")
+        parent = _entity(input, parent_path, cache)
+        message.extends.append(parent)
+        cache.extends[path.resolve()].append(parent_path.resolve())
+
+        assert extends.name.version == parent.version, f"Version error: Entity at {path} includes an extension of {parent.name} with version {extends.name.version}, but should be {parent.version}"
 
 
 def _version(name: str, element: Element) -> int:
@@ -87,7 +408,7 @@ def _package(input: pathlib.Path, path: pathlib.Path,
     return pathlib.Path(str(path).removeprefix(str(input) + "/")).parent
 
 
-def _message(input: pathlib.Path, path: pathlib.Path, element: Element) -> Message:
+def _message(element: Element, links: List[Link]) -> Message:
     name = element.get("name").split(".")[0]
     is_array = element.get("type") == "array"
     nullable = _is_message_nullable(element.get("subtype"))
@@ -107,20 +428,14 @@ def _message(input: pathlib.Path, path: pathlib.Path, element: Element) -> Messa
         extends_raw = element.get("extends")
 
     properties = [_property(property) for property in properties_raw]
-    messages = [_message(input, path, message) for message in messages_raw]
+    messages = [_message(message, links) for message in messages_raw]
 
-    parents: List[Entity] = []
+    # The extended entities are filled in by _link, once they are parsed.
+    message = Message(name, is_array, nullable, properties, messages, [])
     if extends_raw is not None:
-        for extends_item in extends_raw.split("^"):
-            extends = _extends(extends_item)
-            extension = pathlib.Path(*extends.path.parts)
-            dir = pathlib.Path(*input.parts[:input.parts.index("entities")])
-            parent = _entity(input, dir / "entities" / (str(extension) + ".xml"))
-            parents.append(parent)
-
-            assert extends.name.version == parent.version, f"Version error: Entity at {path} includes an extension of {parent.name} with version {extends.name.version}, but should be {parent.version}"
+        links.append((message, extends_raw))
 
-    return Message(name, is_array, nullable, properties, messages, parents)
+    return message
 
 
 def _property(element: Element) -> Property:
@@ -1,28 +1,135 @@
 #!/usr/bin/env python3
 
-from argparse import ArgumentParser
-from sys import exit
+from argparse import ArgumentParser, ArgumentTypeError
+from contextlib import redirect_stdout
+from json import dump
+from os import cpu_count
+from os.path import expanduser
+from sys import argv, exit, stderr, stdout
 
 from apptools.image.core.parser import spec_parser
+from apptools.image.image.cache import RenderCache
 from apptools.image.image.distribute import distribute
+from apptools.image.image.merge import merge
+from apptools.image.image.plan import plan
+from apptools.image.image.watch import watch
+
+# The options of distributing, planning and merging.
+options_parser = ArgumentParser(add_help=False, parents=[spec_parser])
+options_parser.add_argument('-p',
+                            '--platform',
+                            help='only build for a specific platform')
+options_parser.add_argument('-o',
+                            '--overwrite',
+                            help='Overwrite a specific spec settings',
+                            required=False,
+                            action='append')
+
+cache_parser = ArgumentParser(add_help=False)
+cache_parser.add_argument('-c',
+                          '--cache',
+                          help='directory to keep renders in between runs')
+cache_parser.add_argument('--cache-size',
+                          help='maximum size of the cache in MB (default: 1024)',
+                          default=1024,
+                          type=int)
+
+
+def shard(raw):
+    index, _, count = raw.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ArgumentTypeError('Invalid shard %s, expected i/N' % raw)
+    if not 1 <= index <= count:
+        raise ArgumentTypeError('Invalid shard %s, expected 1 <= i <= N' % raw)
+    return index, count
 
 
 def main():
-    parser = ArgumentParser(allow_abbrev=False, parents=[spec_parser])
-    parser.add_argument('-p',
-                        '--platform',
-                        help='only build for a specific platform')
-    parser.add_argument('-o',
-                        '--overwrite',
-                        help='Overwrite a specific spec settings',
-                        required=False,
-                        action='append')
+    # 'app-image plan ...' only tells what 'app-image ...' would do,
+    # 'app-image merge ...' combines the shards of a run.
+    if argv[1:2] == ['plan']:
+        exit(main_plan(argv[2:]))
+    if argv[1:2] == ['merge']:
+        exit(main_merge(argv[2:]))
+
+    parser = ArgumentParser(allow_abbrev=False,
+                            parents=[options_parser, cache_parser])
+    parser.add_argument('-m',
+                        '--memory',
+                        help='memory in MB the images rendered at the same time may use (default: 2048)',
+                        default=2048,
+                        type=int)
+    parser.add_argument('-j',
+                        '--jobs',
+                        help='number of images rendered at the same time (default: number of CPUs)',
+                        default=cpu_count(),
+                        type=int)
+    parser.add_argument('--shard',
+                        help='only make part i of N of the renders, eg. 1/4, '
+                        'see app-image merge',
+                        type=shard)
+    parser.add_argument('--watch',
+                        help='keep running and distribute again when the '
+                        'spec or an image changes',
+                        action='store_true')
 
     args = parser.parse_args()
 
-    distribute(args.spec, args.platform, args.overwrite)
+    if args.watch:
+        if args.shard is not None:
+            parser.error('--watch cannot be combined with --shard')
+        watch(args.spec, args.platform, args.overwrite, cache(args),
+              args.jobs, args.memory * 1024 * 1024)
+        exit(0)
+
+    succeeded = distribute(args.spec, args.platform, args.overwrite,
+                           cache(args), args.jobs, args.memory * 1024 * 1024,
+                           args.shard)
+
+    exit(0 if succeeded else 1)
+
+
+def main_plan(arguments):
+    parser = ArgumentParser(prog='app-image plan',
+                            allow_abbrev=False,
+                            parents=[options_parser, cache_parser],
+                            description='Print what app-image would make as '
+                            'JSON, without rendering or changing any file')
+
+    args = parser.parse_args(arguments)
+
+    # The progress of planning goes to stderr, the plan to stdout.
+    with redirect_stdout(stderr):
+        result = plan(args.spec, args.platform, args.overwrite, cache(args))
+
+    dump(result, stdout, indent=2)
+    stdout.write('\n')
+    return 1 if result['broken'] else 0
+
+
+def main_merge(arguments):
+    parser = ArgumentParser(prog='app-image merge',
+                            allow_abbrev=False,
+                            parents=[options_parser],
+                            description='Combine the files made by the '
+                            'shards of a run (app-image --shard i/N)')
+    parser.add_argument('shards',
+                        nargs='+',
+                        help='directory with the platform repositories of a '
+                        'shard')
+
+    args = parser.parse_args(arguments)
+
+    succeeded = merge(args.spec, args.platform, args.overwrite, args.shards)
+    return 0 if succeeded else 1
+
 
-    exit()
+def cache(args):
+    if args.cache is None:
+        return None
+    return RenderCache(expanduser(args.cache), args.cache_size * 1024 * 1024)
 
 
 if __name__ == "__main__":
@@ -4,7 +4,8 @@ from apptools.image.core.json import json_get
 
 class Image(object):
     def __init__(self, basename, type, targets, style, platforms, colorize,
-                 size, include_style_name, overwrite_name):
+                 size, include_style_name, overwrite_name, vector_max_size,
+                 vector):
         self.basename = basename
         self.type = type
         self.targets = targets
@@ -14,6 +15,8 @@ class Image(object):
         self.size = size
         self.include_style_name = include_style_name
         self.overwrite_name = overwrite_name
+        self.vector_max_size = vector_max_size
+        self.vector = vector
 
     def isSVG(self):
         return self.basename.endswith(".svg")
@@ -32,4 +35,6 @@ class Image(object):
                    json_get('colorize', json, False, True),
                    json_get('size', json, False),
                    json_get('include_style_name', json, False, True),
-                   json_get('overwrite_name', json, False))
+                   json_get('overwrite_name', json, False),
+                   json_get('vector_max_size', json, False, 0),
+                   json_get('vector', json, False))
@@ -29,6 +29,7 @@ def spec(path):
     except KeyError as e:
         raise ArgumentTypeError(e)
 
+    spec.path = path
     return spec
 
 
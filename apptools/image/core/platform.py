@@ -7,13 +7,15 @@ from apptools.image.core.target import Target
 
 class Platform(object):
     def __init__(self, name, path, scales, targets, attributes,
-                 is_default_platform):
+                 is_default_platform, vector, repository):
         self.name = name
         self.path = expanduser(path)
         self.scales = scales
         self.targets = targets
         self.attributes = attributes
         self.is_default_platform = is_default_platform
+        self.vector = vector
+        self.repository = repository
 
     def is_android(self):
         return self.name.startswith("android")
@@ -37,7 +39,8 @@ class Platform(object):
             Target.load_from_json(target)
             for target in json_get('targets', json)
         ], json_get('attributes', json, False, []),
-                   json_get('is_default_platform', json, False, True))
+                   json_get('is_default_platform', json, False, True),
+                   json_get('vector', json, False, False), repository)
 
     def get_target(self, name):
         for target in self.targets:
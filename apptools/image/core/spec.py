@@ -15,6 +15,8 @@ class Spec(object):
         self.images = images
         self.placeholder_colormap = placeholder_colormap
         self.themes = themes
+        # The file the spec was loaded from, see parser.spec().
+        self.path = None
 
     @classmethod
     def load_from_json(cls, json):
@@ -24,11 +24,22 @@ class ImageDefinition(object):
         return "%s-%sx%s@%sx%s" % (imagename, self.size,
                                    self.size, self.scale, extension)
 
+    def pixels(self):
+        return int(float(self.size) * self.scale)
+
 
 class Blueprint(object):
     def __init__(self, definitions):
         self.definitions = definitions
 
+    def pixel_sizes(self):
+        """The first definition of every size in pixels. Several idioms and
+        scales end up at the same size, 20@2x and 40@1x for one."""
+        sizes = {}
+        for definition in self.definitions:
+            sizes.setdefault(definition.pixels(), definition)
+        return sizes
+
     @classmethod
     def make_drawables(cls):
         definitions = [
@@ -0,0 +1,69 @@
+from os import getpid, link, makedirs, remove, replace, stat, utime, walk
+from os.path import dirname, exists, join
+from shutil import copyfile
+
+
+def materialize(source, destination):
+    """Put the file at source at destination too, as a hardlink if possible.
+    Files are replaced at once, they are never written through a link."""
+    tmp = '%s.%s.tmp' % (destination, getpid())
+    try:
+        link(source, tmp)
+    except OSError:
+        copyfile(source, tmp)
+    replace(tmp, destination)
+    # Renaming a link over a link to the same file does nothing at all.
+    if exists(tmp):
+        remove(tmp)
+
+
+class RenderCache(object):
+    """Rendered PNGs by the hash of the SVG, scale and size they were rendered
+    with. Kept between runs up to max_size bytes, the least recently used
+    renders are evicted first."""
+
+    def __init__(self, directory, max_size):
+        super().__init__()
+
+        self.directory = directory
+        self.max_size = max_size
+
+    def path(self, key):
+        return join(self.directory, key[:2], key + '.png')
+
+    def contains(self, key):
+        return exists(self.path(key))
+
+    def get(self, key, destination):
+        path = self.path(key)
+        try:
+            # The modification time marks the last use.
+            utime(path)
+        except FileNotFoundError:
+            return False
+
+        materialize(path, destination)
+        return True
+
+    def put(self, key, source):
+        path = self.path(key)
+        makedirs(dirname(path), exist_ok=True)
+        materialize(source, path)
+
+    def evict(self):
+        renders = []
+        for root, _, names in walk(self.directory):
+            for name in names:
+                path = join(root, name)
+                try:
+                    status = stat(path)
+                except FileNotFoundError:
+                    continue
+                renders.append((status.st_mtime, status.st_size, path))
+
+        size = sum(render[1] for render in renders)
+        for _, render_size, path in sorted(renders):
+            if size <= self.max_size:
+                break
+            remove(path)
+            size -= render_size
@@ -0,0 +1,31 @@
+import re
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=64)
+def colorize(filecontent, colormap):
+    """The SVG with the colors of the colormap replaced, in a single pass so a
+    new color is never replaced again by a later one. Images that share their
+    file and colors (the same theme and style) share the result."""
+    if filecontent is None or not colormap:
+        return filecontent
+
+    pattern, replacements = _substitution(colormap)
+    if not replacements:
+        return filecontent
+    return pattern.sub(lambda match: replacements[match.group(0)], filecontent)
+
+
+@lru_cache(maxsize=None)
+def _substitution(colormap):
+    replacements = {}
+    for color, new_color in colormap:
+        if color:
+            # The first entry of a color wins, as it did when they were
+            # replaced one after the other.
+            replacements.setdefault(color, new_color)
+
+    # The longest colors first, so '#FFF' does not match the start of '#FFFFFF'.
+    colors = sorted(replacements, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(color) for color in colors)), replacements
@@ -1,22 +1,156 @@
-from concurrent.futures import ProcessPoolExecutor
-from copy import deepcopy
-from json import dump
-from os import makedirs
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from os import cpu_count, makedirs
 from os.path import join
-from shutil import copyfile
 from shutil import rmtree
+from signal import SIG_IGN, SIGINT, signal
+from xml.etree.ElementTree import ParseError, fromstring
 
 from apptools.image.core.color import hex_to_rgba
 from apptools.image.core.imagetype import ImageType
 from apptools.image.image.blueprint import Blueprint
+from apptools.image.image.colorize import colorize
 from apptools.image.image.file import file
-from apptools.image.image.svg2png import svg2png
-from apptools.image.image.work import should_do_work_for_platform, should_do_work_for_target
+from apptools.image.image.manifest import Manifest
+from apptools.image.image.output import Contents, Copy, Downscale, Raster, Render, Vector, digest, load_contents
+from apptools.image.image.svgsize import resize
+from apptools.image.image.vectordrawable import Unsupported, vector_drawable
+from apptools.image.image.work import should_do_work_for_platform, should_do_work_for_target, should_keep_vector
+
+# The render cache of a worker, see initialize().
+_cache = None
+
+
+def distribute(spec, only_for_platform, overwrites, cache=None,
+               max_workers=None, memory=None, shard=None, executor=None):
+    """Returns whether every file was distributed. With shard, an (index,
+    count) pair, only that part of the renders is made, see merge(). The
+    renders run on the executor when given, see pool(), or on a pool of
+    their own."""
+    print("Distribute project: '%s'" % spec.project)
 
+    platforms, manifests, jobs, outputs = prepare(spec, only_for_platform,
+                                                  overwrites)
+
+    # A broken image stops the run before anything is deleted or rendered.
+    broken = [job for job in jobs if job.error is not None]
+    if broken:
+        print("Broken images, nothing is distributed:")
+        for job in broken:
+            print("  Image '%s': %s" % (job.image.basename, job.error))
+        return False
+
+    for name, manifest in manifests.items():
+        if manifest.entries is None and shard is None:
+            # Without a previous run to compare with, start from scratch.
+            clear(platforms[name])
+
+    tasks = select(outputs, manifests)
+    if shard is not None:
+        # The merge writes the Contents.json files, they need every shard.
+        tasks = partition(
+            [output for output in tasks if not isinstance(output, Contents)],
+            *shard)
+        print("Shard %s of %s makes %s tasks" % (shard + (len(tasks), )))
+    made = {path for output in tasks for path in output.paths()}
+
+    max_workers = max_workers or cpu_count()
+    if executor is not None:
+        failures = run(executor, tasks, max_workers, memory)
+    else:
+        # What the tasks share is sent to each worker once, a task itself is
+        # only the output to make.
+        contents = {
+            output.content_digest: output.content
+            for output in tasks if isinstance(output, Render)
+        }
+        with pool(max_workers, contents, cache) as executor:
+            failures = run(executor, tasks, max_workers, memory)
+
+    failed = {path for output, _ in failures for path in output.paths()}
+
+    if cache is not None:
+        cache.evict()
+
+    for name, manifest in manifests.items():
+        platform_outputs = [
+            output for output in outputs if output.platform == name
+        ]
+        if shard is None:
+            update(manifest, platform_outputs, failed)
+        else:
+            # What the shard made, for the merge. The manifest of the run is
+            # left as it is, just like the files of the other shards.
+            shard_manifest = Manifest(
+                platforms[name], Manifest.shard_filename(platforms[name],
+                                                         *shard))
+            shard_manifest.save({
+                manifest.name(output): {
+                    'key': output.key,
+                    'image': output.image
+                }
+                for output in platform_outputs
+                if output.path in made and output.path not in failed
+            })
 
-def distribute(spec, only_for_platform, overwrites):
-    print("Distribute project: '%s'" % spec.project)
+    report(jobs, failures)
 
+    print("Done distribute project: '%s'" % spec.project)
+    return not failures
+
+
+def pool(max_workers, contents, cache):
+    """Workers with the contents, SVGs by their digest, and the render
+    cache."""
+    load_contents(contents)
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               initializer=initialize,
+                               initargs=(contents, cache))
+
+
+def run(executor, tasks, max_workers, memory):
+    """Make the tasks, returns the failed ones with their error."""
+    failures = []
+
+    # Tasks are only submitted when there is a worker and the memory to run
+    # them. A task that does not fit lets smaller ones fill what is left, but
+    # once it was passed by as many as there are workers, the memory freed up
+    # is kept for it, so it is not left waiting until the queue is empty.
+    tasks = list(tasks)
+    running = {}
+    used = 0
+    passed = 0
+    while tasks or running:
+        for output in list(tasks):
+            if len(running) == max_workers:
+                break
+            if running and memory is not None and used + estimate(
+                    output) > memory:
+                if output is tasks[0] and passed >= max_workers:
+                    break
+                continue
+
+            passed = 0 if output is tasks[0] else passed + 1
+            tasks.remove(output)
+            running[executor.submit(make, output)] = output
+            used += estimate(output)
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            output = running.pop(future)
+            used -= estimate(output)
+            try:
+                if not future.result():
+                    failures.append((output, 'failed'))
+            except Exception as e:
+                print("Distribute image '%s' to '%s' failed: %s" %
+                      (output.image, output.path, e))
+                failures.append((output, e))
+    return failures
+
+
+def prepare(spec, only_for_platform, overwrites):
+    """Plan the outputs of every image for the spec with the overwrites, the
+    platforms and their manifests by name."""
     if overwrites is not None:
         for overwrite in overwrites:
             obj = spec
@@ -35,30 +169,18 @@ def distribute(spec, only_for_platform, overwrites):
                         setattr(obj, path, value)
                     else:
                         obj = getattr(obj, component)
-    # clear directories
+
+    platforms = {}
+    manifests = {}
     for platform in spec.platforms:
         if only_for_platform is not None and only_for_platform != platform.name:
             print(f'Skip for platform {platform}')
             continue
-        for target in platform.targets:
-            for scale in platform.scales:
-                if platform.is_android():
-                    destination_directory_path = join(platform.path, target.assets,
-                                                      scale.directory)
-                    print(f'Deleting directory {destination_directory_path}')
-                    try:
-                        rmtree(destination_directory_path)
-                    except:
-                        print('Deleting failed')
-
-                elif platform.is_ios():
-                    asset_directory_path = join(platform.path, target.assets)
-                    print(f'Deleting directory {asset_directory_path}')
-                    try:
-                        rmtree(asset_directory_path)
-                    except:
-                        print('Deleting failed')
-                    makedirs(asset_directory_path)
+
+        manifest = Manifest(platform)
+        manifest.load()
+        platforms[platform.name] = platform
+        manifests[platform.name] = manifest
 
     jobs = []
     for image in spec.images:
@@ -67,11 +189,178 @@ def distribute(spec, only_for_platform, overwrites):
 
     print("Executing %s jobs" % len(jobs))
 
-    max_workers = 10
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        [executor.submit(job.run) for job in jobs]
+    outputs = []
+    for job in jobs:
+        job_outputs = job.plan()
+        if job_outputs is not None:
+            outputs += job_outputs
+    return platforms, manifests, jobs, outputs
+
+
+def select(outputs, manifests):
+    """The tasks to make the outputs whose key changed since the previous run,
+    the largest first."""
+    dirty = [
+        output for output in outputs
+        if manifests[output.platform].is_dirty(output)
+    ]
+    print("Distributing %s of %s files" % (len(dirty), len(outputs)))
+
+    # A downscale is made from the file of its master, so that is made again.
+    dirty += masters(dirty, outputs)
+
+    # Every output is a task of its own, but for the renders of one SVG, and
+    # the largest renders go first, so no worker is left with a long tail of
+    # work at the end. A task needs the memory of its largest render, the
+    # others are made after it.
+    return sorted(share(dirty), key=lambda output: output.pixels, reverse=True)
+
+
+def partition(tasks, index, count):
+    """The tasks of shard index (from 1) of count. The largest task goes to
+    the shard with the least work so far, so the shards get about the same
+    work, and every shard of a run divides them alike."""
+    shards = [[] for _ in range(count)]
+    work = [0] * count
+    for output in sorted(tasks, key=lambda output: (-cost(output), output.path)):
+        shard = work.index(min(work))
+        shards[shard].append(output)
+        work[shard] += cost(output)
+    return shards[index - 1]
+
+
+def cost(output):
+    # A task is at least some work, even a copy.
+    if isinstance(output, Render):
+        return max(sum(made.pixels for made in output.outputs()), 1)
+    return max(output.pixels, 1)
+
+
+def report(jobs, failures):
+    summary = [line for job in jobs for line in job.summary]
+    summary += [
+        "Image '%s' to '%s' failed: %s" % (output.image, output.path, error)
+        for output, error in failures
+    ]
+    if summary:
+        print("Summary:")
+        for line in summary:
+            print("  %s" % line)
+
+
+def clear(platform):
+    for target in platform.targets:
+        if platform.is_android():
+            for scale in platform.scales:
+                destination_directory_path = join(platform.path, target.assets,
+                                                  scale.directory)
+                print(f'Deleting directory {destination_directory_path}')
+                try:
+                    rmtree(destination_directory_path)
+                except:
+                    print('Deleting failed')
+
+        elif platform.is_ios():
+            asset_directory_path = join(platform.path, target.assets)
+            print(f'Deleting directory {asset_directory_path}')
+            try:
+                rmtree(asset_directory_path)
+            except:
+                print('Deleting failed')
+            makedirs(asset_directory_path)
+
+
+def masters(dirty, outputs):
+    """The renders of the dirty downscales that are not dirty themselves."""
+    keys = {output.master_key for output in dirty if isinstance(output, Downscale)}
+    keys -= {output.render_key for output in dirty if isinstance(output, Render)}
+
+    found = {}
+    for output in outputs:
+        if isinstance(output, Render) and output.render_key in keys:
+            found.setdefault(output.render_key, output)
+    return list(found.values())
+
+
+def share(outputs):
+    """Rasters of the same pixels are made once, by the first of them, which
+    hands the result to the others. Downscales are made by their master and
+    the renders of one SVG by the largest of them."""
+    rasters = {}
+    shared = []
+    for output in outputs:
+        if isinstance(output, Raster):
+            if output.render_key in rasters:
+                rasters[output.render_key].share(output)
+                continue
+            rasters[output.render_key] = output
+        if not isinstance(output, Downscale):
+            shared.append(output)
+
+    for output in rasters.values():
+        if isinstance(output, Downscale):
+            rasters[output.master_key].derive(output)
+    return group(shared)
+
+
+def group(outputs):
+    # A worker keeps the SVG it parsed, but a task of its own for every scale
+    # mostly lands on another worker, which parses it again.
+    largest = {}
+    for output in outputs:
+        if isinstance(output, Render):
+            render = largest.get(output.content_digest)
+            if render is None or output.pixels > render.pixels:
+                largest[output.content_digest] = output
+
+    grouped = []
+    for output in outputs:
+        if isinstance(output, Render):
+            render = largest[output.content_digest]
+            if output is not render:
+                render.group(output)
+                continue
+        grouped.append(output)
+    return grouped
 
-    print("Done distribute project: '%s'" % spec.project)
+
+def estimate(output):
+    """The bytes of memory a task needs, for the pixels it draws."""
+    return output.pixels * 4
+
+
+def initialize(contents, cache):
+    global _cache
+    _cache = cache
+    # Ctrl-C is up to the parent, it stops the pool once the running renders
+    # are done.
+    signal(SIGINT, SIG_IGN)
+    load_contents(contents)
+
+
+def make(output):
+    return output.make(_cache)
+
+
+def update(manifest, outputs, failed):
+    previous = manifest.entries or {}
+
+    entries = {}
+    for output in outputs:
+        name = manifest.name(output)
+        if output.path not in failed:
+            entries[name] = {'key': output.key, 'image': output.image}
+        elif name in previous:
+            # The file is left as it was, its key no longer matches so it is
+            # made again next run.
+            entries[name] = previous[name]
+
+    # The outputs no longer in the spec are removed.
+    for name in previous:
+        if name not in entries:
+            manifest.remove(name)
+
+    manifest.save(entries)
 
 
 class DistributeJob(object):
@@ -81,17 +370,33 @@ class DistributeJob(object):
         self.spec = spec
         self.image = image
         self.only_for_platform = only_for_platform
-
-    def run(self):
+        # What was made of the image where there was a choice, for the summary.
+        self.summary = []
+        # Why the image cannot be distributed, see plan().
+        self.error = None
+
+    def plan(self):
+        """The outputs of the image, None with the error set when its file is
+        broken."""
         print("Distribute image: '%s'" % file(self.image))
         image_path = join(self.spec.shared_path, 'images', self.image.basename)
 
+        print("Load into memory: '%s'" % image_path)
+        source = self.load(image_path)
+        if source is None:
+            return None
+
+        source_digest = digest(source)
         filecontent = None
         if self.image.isSVG():
-            print("Load into memory: '%s'" % image_path)
-
-            filecontent = self.load(image_path)
-
+            filecontent = self.check_svg(source)
+            if filecontent is None:
+                return None
+        elif self.image.isPNG() and not source.startswith(b'\x89PNG\r\n\x1a\n'):
+            self.error = 'not a PNG file'
+            return None
+
+        outputs = []
         for platform in self.spec.platforms:
             if not should_do_work_for_platform(self.image, platform, self.only_for_platform):
                 print(f'Skip for platform {platform}')
@@ -103,27 +408,48 @@ class DistributeJob(object):
                     print('Skip for target %s' % target)
                     continue
 
-                # since we reuse the filecontent for all images, we need to copy it to be change
-                # free each iteration. Filecontent can be None if it isn't a svg
-                filecontent_copy = deepcopy(filecontent)
-                print('About to save image for %s(%s) at %s' % (target, platform,
+                print('About to plan image for %s(%s) at %s' % (target, platform,
                       image_path))
-                colorized_filecontent = self.colorize(filecontent_copy,
-                                                      platform, target)
-                self.save(colorized_filecontent, image_path, platform, target)
+                colormap = self.colormap(target)
+                if colormap is None:
+                    return None
+                colorized_filecontent = colorize(filecontent, colormap)
+                target_outputs = self.plan_platform(colorized_filecontent,
+                                                    source_digest, colormap,
+                                                    image_path, platform,
+                                                    target)
+                for output in target_outputs:
+                    output.target = target.name
+                outputs += target_outputs
+        return outputs
 
     def load(self, path):
         try:
-            with open(path) as fp:
+            with open(path, 'rb') as fp:
                 return fp.read()
-        except:
+        except OSError as e:
             print('Cannot open image file at "%s"' % path)
+            self.error = 'cannot open "%s": %s' % (path, e.strerror)
 
         return None
 
-    def colorize(self, filecontent, platform, target):
+    def check_svg(self, source):
+        """The SVG as text, when it is one."""
+        try:
+            fromstring(source)
+            return source.decode('UTF-8')
+        except ParseError as e:
+            self.error = 'not a valid SVG: %s' % e
+        except UnicodeDecodeError:
+            self.error = 'not UTF-8'
+
+        return None
+
+    def colormap(self, target):
+        """The colors to replace in the image for the target, in order. None
+        with the error set when the theme has no color for a name."""
         if not self.image.isSVG() or not self.image.colorize:
-            return filecontent
+            return ()
 
         selected_theme = None
         for theme in self.spec.themes:
@@ -133,54 +459,72 @@ class DistributeJob(object):
         else:
             print("Invalid theme: '%s' for image '%s'" %
                   (target.name, self.image.basename))
-            return filecontent
+            return ()
 
         print("Colorize image: '%s' with theme: '%s' and style: '%s'" %
               (self.image.basename, selected_theme.name, self.image.style))
 
         colorset = selected_theme.get(self.image.style)
 
+        colormap = []
         for color_name, color in self.spec.placeholder_colormap.items():
             new_color = colorset.get(color_name)
             if new_color is not None:
+                if not isinstance(new_color, str):
+                    self.error = "no color '%s' in theme '%s' for style '%s'" % (
+                        color_name, selected_theme.name, self.image.style)
+                    return None
                 if len(new_color) > 6:
                     new_color = "rgba(%s, %s, %s, %s)" % hex_to_rgba(new_color)
 
-                    print(
-                        "Image: '%s': replace color: '%s' with new color: '%s'"
-                        % (self.image.basename, color, new_color))
-                else:
-                    print(
-                        "Image: '%s': replace color: '%s' with new color: '%s'"
-                        % (self.image.basename, color, new_color))
+                print("Image: '%s': replace color: '%s' with new color: '%s'"
+                      % (self.image.basename, color, new_color))
 
-                filecontent = filecontent.replace(color, new_color)
-        return filecontent
+                colormap.append((color, new_color))
+        return tuple(colormap)
 
-    def save(self, filecontent, image_path, platform, target):
+    def plan_platform(self, filecontent, source_digest, colormap, image_path,
+                      platform, target):
         if platform.is_ios():
-            self.save_ios(filecontent, image_path, platform, target)
+            return self.plan_ios(filecontent, source_digest, colormap,
+                                 image_path, platform, target)
         elif platform.is_android():
-            self.save_android(filecontent, image_path, platform, target)
+            return self.plan_android(filecontent, source_digest, colormap,
+                                     image_path, platform, target)
         else:
             print("Unknown platform '%s'" % platform.name)
+            return []
 
-    def save_ios(self, filecontent, image_path, platform, target):
+    def plan_ios(self, filecontent, source_digest, colormap, image_path,
+                 platform, target):
         if self.image.type == ImageType.APPICON:
-            self.save_ios_appiconset(filecontent, image_path, platform, target)
+            return self.plan_ios_appiconset(filecontent, source_digest,
+                                            colormap, platform, target)
         else:
-            self.save_ios_imageset(filecontent, image_path, platform, target)
+            return self.plan_ios_imageset(filecontent, source_digest,
+                                          colormap, image_path, platform,
+                                          target)
 
-    def save_ios_appiconset(self, filecontent, image_path, platform, target):
+    def plan_ios_appiconset(self, filecontent, source_digest, colormap,
+                            platform, target):
         imageset_name = file(self.image, '.' + self.image.type.to_set())
         imageset_directory_path = join(platform.path, target.assets,
                                        imageset_name)
 
-        makedirs(imageset_directory_path, exist_ok=True)
-
+        outputs = []
         contents = {"images": [], "info": {"version": 1, "author": "xcode"}}
 
         blueprint = Blueprint.make_appiconset_blueprint()
+        # Icons of the same size in pixels are rendered alike, so they are made
+        # once and the other files are hardlinked to it, see share().
+        sizes = blueprint.pixel_sizes()
+        # The largest icon is rendered, the others are downscaled from it.
+        # Unless they are small enough to render from the SVG, when asked for,
+        # which keeps thin lines sharp.
+        largest = sizes[max(sizes)]
+        master = self.plan_appicon(filecontent, source_digest, colormap,
+                                   imageset_directory_path, platform, largest,
+                                   largest)
         for definition in blueprint.definitions:
             filename = definition.filename('appicon')
             destination_path = join(imageset_directory_path, filename)
@@ -196,18 +540,44 @@ class DistributeJob(object):
                 "%sx" % definition.scale
             })
 
-            svg2png(filecontent, definition.scale, destination_path, f"{definition.size}x{definition.size}")
+            if definition is largest:
+                outputs.append(master)
+            elif definition.pixels() <= self.image.vector_max_size:
+                outputs.append(
+                    self.plan_appicon(filecontent, source_digest, colormap,
+                                      imageset_directory_path, platform,
+                                      definition,
+                                      sizes[definition.pixels()]))
+            else:
+                outputs.append(
+                    Downscale(platform.name, self.image.basename,
+                              destination_path, master, definition.pixels()))
 
         contents_json_path = join(imageset_directory_path, 'Contents.json')
-        self.save_ios_contents_json(contents_json_path, contents, indent=2)
-
-    def save_ios_imageset(self, filecontent, image_path, platform, target):
+        outputs.append(
+            Contents(platform.name, self.image.basename, contents_json_path,
+                     contents))
+        return outputs
+
+    def plan_appicon(self, filecontent, source_digest, colormap,
+                     imageset_directory_path, platform, definition, rendered):
+        destination_path = join(imageset_directory_path,
+                                definition.filename('appicon'))
+        return Render(platform.name, self.image.basename, destination_path,
+                      filecontent, source_digest, colormap, rendered.scale,
+                      f"{rendered.size}x{rendered.size}")
+
+    def plan_ios_imageset(self, filecontent, source_digest, colormap,
+                          image_path, platform, target):
         imageset_name = file(self.image, '.imageset')
         imageset_directory_path = join(platform.path, target.assets,
                                        imageset_name)
 
-        makedirs(imageset_directory_path, exist_ok=True)
+        if should_keep_vector(self.image, platform):
+            return self.plan_ios_vector(filecontent, source_digest, colormap,
+                                        imageset_directory_path, platform)
 
+        outputs = []
         contents = {"images": [], "info": {"version": 1, "author": "xcode"}}
 
         filecopied = False
@@ -224,7 +594,10 @@ class DistributeJob(object):
                     "scale":
                     '%sx' % int(scale.multiplier)
                 })
-                svg2png(filecontent, scale.multiplier, destination_path, self.image.size)
+                outputs.append(
+                    Render(platform.name, self.image.basename,
+                           destination_path, filecontent, source_digest,
+                           colormap, scale.multiplier, self.image.size))
             elif self.image.isPNG():
                 content = {
                     "idiom": "universal",
@@ -234,7 +607,9 @@ class DistributeJob(object):
                 if not filecopied:
                     content["scale"] = '%sx' % int(scale.multiplier)
                     content["filename"] = image_name
-                    copyfile(image_path, destination_path)
+                    outputs.append(
+                        Copy(platform.name, self.image.basename,
+                             destination_path, image_path, source_digest))
                     filecopied = True
 
                 contents['images'].append(content)
@@ -242,32 +617,78 @@ class DistributeJob(object):
                 print("Unknown filetype: '%s'" % self.image.basename)
 
         contents_json_path = join(imageset_directory_path, 'Contents.json')
-        self.save_ios_contents_json(contents_json_path, contents)
+        outputs.append(
+            Contents(platform.name, self.image.basename, contents_json_path,
+                     contents))
+        return outputs
+
+    def plan_ios_vector(self, filecontent, source_digest, colormap,
+                        imageset_directory_path, platform):
+        # One SVG for all scales, Xcode draws it at the size of the SVG.
+        image_name = file(self.image, '.svg')
+        destination_path = join(imageset_directory_path, image_name)
+        if self.image.size is not None:
+            filecontent = resize(filecontent, self.image.size)
+
+        contents = {
+            "images": [{
+                "idiom": "universal",
+                "filename": image_name
+            }],
+            "info": {
+                "version": 1,
+                "author": "xcode"
+            },
+            "properties": {
+                "preserves-vector-representation": True
+            }
+        }
 
-    def save_ios_contents_json(self, path, data, indent=None):
-        print("Write Contents.json at '%s'" % path)
-        with open(path, 'w') as fp:
-            # Platform iOS uses 2 indent for images
-            dump(data, fp, indent=2)
+        contents_json_path = join(imageset_directory_path, 'Contents.json')
+        return [
+            Vector(platform.name, self.image.basename, destination_path,
+                   filecontent),
+            Contents(platform.name, self.image.basename, contents_json_path,
+                     contents)
+        ]
+
+    def plan_android(self, filecontent, source_digest, colormap, image_path,
+                     platform, target):
+        if should_keep_vector(self.image, platform):
+            try:
+                drawable = vector_drawable(filecontent, self.image.size)
+            except Unsupported as e:
+                self.summary.append("Image '%s' for %s(%s): png, %s" %
+                                    (file(self.image, ''), target.name,
+                                     platform.name, e))
+            else:
+                self.summary.append("Image '%s' for %s(%s): vector drawable" %
+                                    (file(self.image, ''), target.name,
+                                     platform.name))
+                # One drawable for all densities, instead of a png for each.
+                destination_path = join(platform.path, target.assets,
+                                        'drawable', file(self.image, '.xml'))
+                return [
+                    Vector(platform.name, self.image.basename,
+                           destination_path, drawable)
+                ]
 
-    def save_android(self, filecontent, image_path, platform, target):
         image_name = file(self.image)
 
+        outputs = []
         for scale in platform.scales:
             destination_directory_path = join(platform.path, target.assets,
                                               scale.directory)
-            makedirs(destination_directory_path, exist_ok=True)
             destination_path = join(destination_directory_path, image_name)
             if self.image.isSVG():
-                svg2png(filecontent, scale.multiplier, destination_path, self.image.size)
-
-                print(
-                    "Converted image: '%s' svg to png at scale: '%s' to: '%s'"
-                    % (image_path, scale.multiplier, destination_path))
+                outputs.append(
+                    Render(platform.name, self.image.basename,
+                           destination_path, filecontent, source_digest,
+                           colormap, scale.multiplier, self.image.size))
             elif self.image.basename.endswith('.png'):
-                copyfile(image_path, destination_path)
-
-                print("Copied image: '%s': to: '%s'" %
-                      (image_path, destination_path))
+                outputs.append(
+                    Copy(platform.name, self.image.basename, destination_path,
+                         image_path, source_digest))
                 # pngs are only set in the first scale
                 break
+        return outputs
@@ -0,0 +1,73 @@
+from json import JSONDecodeError, dump, load
+from os import makedirs, remove, replace, rmdir
+from os.path import dirname, exists, join, relpath
+
+from apptools.config import config
+
+
+class Manifest(object):
+    """The files distributed to a platform by the previous run, with the key
+    of their content. Stored next to them, in the repository of the platform.
+    """
+
+    def __init__(self, platform, filename=None, directory=None):
+        super().__init__()
+
+        self.directory = directory or platform.path
+        self.path = join(self.directory,
+                         filename or '.app-image-%s.json' % platform.name)
+        # None when there is no (usable) previous run.
+        self.entries = None
+
+    @classmethod
+    def shard_filename(cls, platform, index, count):
+        """The manifest of the files a shard made, see merge()."""
+        return '.app-image-%s.shard-%s-of-%s.json' % (platform.name, index,
+                                                      count)
+
+    def load(self):
+        try:
+            with open(self.path) as fp:
+                manifest = load(fp)
+        except (OSError, JSONDecodeError):
+            return
+
+        if manifest.get('version') == config.VERSION:
+            self.entries = manifest['entries']
+
+    def save(self, entries):
+        self.entries = entries
+
+        makedirs(self.directory, exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as fp:
+            dump({
+                'version': config.VERSION,
+                'entries': entries
+            }, fp, indent=2, sort_keys=True)
+        replace(tmp, self.path)
+
+    def name(self, output):
+        return relpath(output.path, self.directory)
+
+    def is_dirty(self, output):
+        if self.entries is None:
+            return True
+
+        entry = self.entries.get(self.name(output))
+        return entry is None or entry['key'] != output.key or not exists(
+            output.path)
+
+    def remove(self, name):
+        path = join(self.directory, name)
+        print("Remove '%s'" % path)
+        try:
+            remove(path)
+        except FileNotFoundError:
+            pass
+
+        # An imageset without files is gone as well.
+        try:
+            rmdir(dirname(path))
+        except OSError:
+            pass
@@ -0,0 +1,83 @@
+from glob import glob
+from os import makedirs
+from os.path import basename, dirname, join
+
+from apptools.image.image.cache import materialize
+from apptools.image.image.distribute import clear, prepare, report, update
+from apptools.image.image.manifest import Manifest
+from apptools.image.image.output import Contents
+
+
+def merge(spec, only_for_platform, overwrites, shards):
+    """Combine the files made by the shards of a run into the repositories of
+    the platforms, as a run without shards would have. Every shard is a
+    directory with the repositories of the platforms the shard ran on.
+    Returns whether every file was made by a shard."""
+    print("Merge project: '%s' from %s shards" % (spec.project, len(shards)))
+
+    platforms, manifests, jobs, outputs = prepare(spec, only_for_platform,
+                                                  overwrites)
+
+    broken = [job for job in jobs if job.error is not None]
+    if broken:
+        print("Broken images, nothing is merged:")
+        for job in broken:
+            print("  Image '%s': %s" % (job.image.basename, job.error))
+        return False
+
+    failures = []
+    for name, manifest in manifests.items():
+        platform = platforms[name]
+        if manifest.entries is None:
+            clear(platform)
+
+        made = files(platform, shards)
+
+        platform_outputs = [
+            output for output in outputs if output.platform == name
+        ]
+        failed = set()
+        for output in platform_outputs:
+            if not manifest.is_dirty(output):
+                continue
+
+            if isinstance(output, Contents):
+                # The same for every shard, so it is made here.
+                output.make()
+                continue
+
+            path = made.get((manifest.name(output), output.key))
+            if path is None:
+                print("No shard made '%s'" % output.path)
+                failures.append((output, 'not made by a shard'))
+                failed.add(output.path)
+                continue
+
+            makedirs(dirname(output.path), exist_ok=True)
+            materialize(path, output.path)
+            print("Merged image: '%s' from: '%s'" % (output.path, path))
+
+        update(manifest, platform_outputs, failed)
+
+    report(jobs, failures)
+
+    print("Done merge project: '%s'" % spec.project)
+    return not failures
+
+
+def files(platform, shards):
+    """The files the shards made for the platform, by their name and key."""
+    made = {}
+    for shard in shards:
+        directory = join(shard, platform.repository)
+        pattern = Manifest.shard_filename(platform, '*', '*')
+        for path in sorted(glob(join(directory, pattern))):
+            shard_manifest = Manifest(platform, basename(path), directory)
+            shard_manifest.load()
+            if shard_manifest.entries is None:
+                print("Skip shard manifest of another version: '%s'" % path)
+                continue
+
+            for name, entry in shard_manifest.entries.items():
+                made[(name, entry['key'])] = join(directory, name)
+    return made
@@ -0,0 +1,288 @@
+from functools import lru_cache
+from hashlib import sha256
+from importlib import metadata
+from json import dump, dumps
+from os import getpid, makedirs, remove, replace
+from os.path import dirname, exists
+from shutil import copyfile
+
+from apptools.image.image.cache import materialize
+from apptools.image.image.svgsize import pixels
+
+# The SVGs to render by their digest. A worker gets them once when it starts,
+# see load_contents(), so their renders are sent to it without them.
+_contents = {}
+
+
+def digest(content):
+    return sha256(content).hexdigest()
+
+
+def make_key(*components):
+    # A hash of everything the content of an output depends on.
+    return digest(dumps(components).encode())
+
+
+def load_contents(contents):
+    _contents.update(contents)
+
+
+@lru_cache(maxsize=1)
+def version():
+    # Part of the key of every render, a new cairosvg may render differently.
+    # Taken from the package, importing cairosvg needs cairo itself, which
+    # planning does not have. The plan and the run must agree on the keys, so
+    # without the package both use the same placeholder.
+    try:
+        return metadata.version('CairoSVG')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+class Output(object):
+    """A file distributed for an image to a platform."""
+
+    # An estimate of the work to make the output, see Render.
+    pixels = 0
+    # The name of the target the output is for, see DistributeJob.plan().
+    target = None
+
+    def __init__(self, platform, image, path, key):
+        super().__init__()
+
+        self.platform = platform
+        self.image = image
+        self.path = path
+        self.key = key
+
+    def paths(self):
+        return [self.path]
+
+    def describe(self):
+        """The output as it is planned, see plan()."""
+        return {
+            'type': type(self).__name__.lower(),
+            'image': self.image,
+            'platform': self.platform,
+            'target': self.target,
+            'path': self.path,
+            'key': self.key,
+            'pixels': self.pixels,
+        }
+
+    def make(self, cache=None):
+        """Write the output, returns whether that succeeded."""
+        for path in self.paths():
+            makedirs(dirname(path), exist_ok=True)
+        return self.write(cache)
+
+    def write(self, cache):
+        raise NotImplementedError
+
+    def temporary(self):
+        # Outputs are written next to their path first and then replace it,
+        # so a hardlinked render in the cache is never written through.
+        return '%s.%s.tmp' % (self.path, getpid())
+
+
+class Raster(Output):
+    """A PNG, made once for all the paths that get the same pixels."""
+
+    def __init__(self, platform, image, path, key, render_key):
+        super().__init__(platform, image, path, key)
+
+        # The same for every output of the same pixels, whatever the image.
+        self.render_key = render_key
+        # Other paths that get the same pixels, see share().
+        self.duplicates = []
+
+    def paths(self):
+        return [self.path] + self.duplicates
+
+    def share(self, other):
+        if other.path != self.path:
+            self.duplicates.append(other.path)
+
+    def describe(self):
+        description = super().describe()
+        description['render_key'] = self.render_key
+        return description
+
+    def write(self, cache):
+        if cache is not None and cache.get(self.render_key, self.path):
+            print("Reused image: '%s' for: '%s'" % (self.image, self.path))
+        else:
+            tmp = self.temporary()
+            try:
+                self.convert(tmp)
+                if cache is not None:
+                    cache.put(self.render_key, tmp)
+                replace(tmp, self.path)
+            finally:
+                if exists(tmp):
+                    remove(tmp)
+
+        for path in self.duplicates:
+            materialize(self.path, path)
+            print("Shared image: '%s' to: '%s'" % (self.path, path))
+        return True
+
+    def convert(self, path):
+        raise NotImplementedError
+
+
+class Render(Raster):
+    def __init__(self, platform, image, path, content, source_digest, colormap,
+                 scale, size):
+        content_digest = digest(content.encode('UTF-8'))
+        super().__init__(platform, image, path,
+                         make_key('render', source_digest, colormap, scale,
+                                  size, version()),
+                         make_key(content_digest, scale, size, version()))
+
+        self.content = content
+        self.content_digest = content_digest
+        self.scale = scale
+        self.size = size
+        self.pixels = pixels(content, scale, size)
+        # The downscales made from this render, see derive().
+        self.derived = []
+        # The renders of the same SVG at other scales, made right after this
+        # one while the parsed SVG is at hand, see group().
+        self.scales = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.content_digest in _contents:
+            del state['content']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'content' not in state:
+            self.content = _contents[self.content_digest]
+
+    def paths(self):
+        return super().paths() + [
+            path for output in self.derived + self.scales
+            for path in output.paths()
+        ]
+
+    def outputs(self):
+        """This render and the outputs made along with it."""
+        outputs = [self] + self.derived
+        for render in self.scales:
+            outputs += render.outputs()
+        return outputs
+
+    def derive(self, downscale):
+        self.derived.append(downscale)
+
+    def group(self, render):
+        self.scales.append(render)
+
+    def describe(self):
+        description = super().describe()
+        description.update(scale=self.scale, size=self.size)
+        return description
+
+    def write(self, cache):
+        super().write(cache)
+
+        for output in self.derived:
+            output.source = self.path
+            output.make(cache)
+
+        made = True
+        for render in self.scales:
+            made = render.make(cache) and made
+        return made
+
+    def convert(self, path):
+        # Only imported to render, planning does without cairo.
+        from apptools.image.image.svg2png import svg2png
+
+        svg2png(self.content, self.scale, path, self.size)
+        print("Converted image: '%s' svg to png at scale: '%s' to: '%s'" %
+              (self.image, self.scale, self.path))
+
+
+class Downscale(Raster):
+    """A render resampled to a smaller size, instead of rendering the SVG
+    again. Made right after the render it is made from, its master."""
+
+    def __init__(self, platform, image, path, master, size):
+        super().__init__(platform, image, path,
+                         make_key('downscale', master.key, size),
+                         make_key('downscale', master.render_key, size))
+
+        self.master_key = master.render_key
+        self.size = size
+        self.pixels = size * size
+        # The file of the master, once it is made.
+        self.source = None
+
+    def describe(self):
+        description = super().describe()
+        description.update(size=self.size, master_key=self.master_key)
+        return description
+
+    def convert(self, path):
+        from apptools.image.image.svg2png import downscale
+
+        downscale(self.source, path, self.size, self.size)
+
+        print("Downscaled image: '%s' to %spx: '%s'" %
+              (self.image, self.size, self.path))
+
+
+class Vector(Output):
+    """A vector image the platform draws at every size itself, an SVG for iOS
+    or a vector drawable for Android."""
+
+    def __init__(self, platform, image, path, content):
+        super().__init__(platform, image, path,
+                         make_key('vector', digest(content.encode('UTF-8'))))
+
+        self.content = content
+
+    def write(self, cache):
+        tmp = self.temporary()
+        with open(tmp, 'w') as fp:
+            fp.write(self.content)
+        replace(tmp, self.path)
+
+        print("Wrote vector image: '%s' to: '%s'" % (self.image, self.path))
+        return True
+
+
+class Copy(Output):
+    def __init__(self, platform, image, path, source, source_digest):
+        super().__init__(platform, image, path,
+                         make_key('copy', source_digest))
+
+        self.source = source
+
+    def write(self, cache):
+        tmp = self.temporary()
+        copyfile(self.source, tmp)
+        replace(tmp, self.path)
+
+        print("Copied image: '%s': to: '%s'" % (self.source, self.path))
+        return True
+
+
+class Contents(Output):
+    def __init__(self, platform, image, path, data):
+        super().__init__(platform, image, path, make_key('contents', data))
+
+        self.data = data
+
+    def write(self, cache):
+        print("Write Contents.json at '%s'" % self.path)
+        tmp = self.temporary()
+        with open(tmp, 'w') as fp:
+            # Platform iOS uses 2 indent for images
+            dump(self.data, fp, indent=2)
+        replace(tmp, self.path)
+        return True
@@ -0,0 +1,69 @@
+from apptools.image.image.distribute import prepare, select
+from apptools.image.image.output import Downscale, Raster, Render
+
+
+def plan(spec, only_for_platform, overwrites, cache=None):
+    """What distributing the spec would do, without making or removing any
+    file: every output with whether it is up to date, the file it is made
+    from and whether the cache has it, and the work that is left."""
+    platforms, manifests, jobs, outputs = prepare(spec, only_for_platform,
+                                                  overwrites)
+    broken = [{
+        'image': job.image.basename,
+        'error': job.error
+    } for job in jobs if job.error is not None]
+
+    up_to_date = {
+        output for output in outputs
+        if not manifests[output.platform].is_dirty(output)
+    }
+    tasks = select(outputs, manifests)
+
+    # The outputs that are made, the others are hardlinked to one of them.
+    made = []
+    for task in tasks:
+        if isinstance(task, Render):
+            made += task.outputs()
+        else:
+            made.append(task)
+
+    made_by = {}
+    for output in made:
+        made_by[output.path] = output.path
+        if isinstance(output, Raster):
+            for path in output.duplicates:
+                made_by[path] = output.path
+
+    def cached(output):
+        return (cache is not None and isinstance(output, Raster)
+                and cache.contains(output.render_key))
+
+    entries = []
+    for output in outputs:
+        description = output.describe()
+        description.update(up_to_date=output in up_to_date,
+                           made_by=made_by.get(output.path),
+                           cached=cached(output))
+        entries.append(description)
+
+    drawn = [
+        output for output in made
+        if isinstance(output, Raster) and not cached(output)
+    ]
+    return {
+        'project': spec.project,
+        'broken': broken,
+        'summary': {
+            'files': len(outputs),
+            'up_to_date': len(up_to_date),
+            'made': len(made),
+            'cached': len([output for output in made if cached(output)]),
+            'renders': len([output for output in drawn
+                            if isinstance(output, Render)]),
+            'downscales': len([output for output in drawn
+                               if isinstance(output, Downscale)]),
+            'pixels': sum(output.pixels for output in drawn
+                          if isinstance(output, Render)),
+        },
+        'outputs': entries,
+    }
@@ -1,14 +1,65 @@
-import cairosvg
+from functools import lru_cache
+from os import stat
 
+import cairocffi
 
-def svg2png(filecontent, scale, path, size=None):
-    encoding = 'UTF-8'
-    bytestring = bytes(filecontent, encoding)
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
 
+
+def svg2png(filecontent, scale, path, size=None):
     if size is None:
-        cairosvg.svg2png(bytestring=bytestring, write_to=path, scale=scale)
+        _render(filecontent, scale, path)
     else:
-        try:
-            cairosvg.svg2png(bytestring=bytestring, write_to=path, scale=scale, parent_width=float(size.split("x")[0]), parent_height=float(size.split("x")[1]))
-        except:
-            print('svg2png failed') 
+        _render(filecontent, scale, path, float(size.split("x")[0]), float(size.split("x")[1]))
+
+
+def downscale(source, path, width, height):
+    """Resample the PNG at source to width x height pixels."""
+    status = stat(source)
+    master = _load(source, status.st_ino, status.st_mtime_ns)
+
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+    context = cairocffi.Context(surface)
+    context.scale(width / master.get_width(), height / master.get_height())
+    context.set_source_surface(master)
+    # Cairo's best filter looks at all the pixels that make up a smaller one,
+    # the default only at a few of them.
+    context.get_source().set_filter(cairocffi.FILTER_BEST)
+    context.paint()
+    surface.write_to_png(path)
+
+
+def _render(filecontent, scale, path, parent_width=None, parent_height=None):
+    # What cairosvg.svg2png() does, but with a parsed tree for all scales.
+    surface = PNGSurface(_copy(_parse(filecontent)), path, 96,
+                         parent_width=parent_width,
+                         parent_height=parent_height,
+                         scale=scale)
+    surface.finish()
+
+
+@lru_cache(maxsize=16)
+def _parse(filecontent):
+    """Parse an SVG once for all of its renders, which draw on a copy."""
+    encoding = 'UTF-8'
+    return Tree(bytestring=bytes(filecontent, encoding))
+
+
+def _copy(node, parent=None):
+    # Drawing changes the nodes of masks, patterns and text, so every render
+    # gets its own nodes. The parsed XML and CSS they refer to are shared,
+    # parsing those is what takes the time.
+    copy = node.__class__.__new__(node.__class__)
+    copy.update(node)
+    copy.__dict__.update(node.__dict__)
+    if parent is not None:
+        copy.parent = parent
+    copy.children = [_copy(child, copy) for child in node.children]
+    return copy
+
+
+@lru_cache(maxsize=1)
+def _load(path, inode, modified):
+    # All the downscales of a master are made one after the other.
+    return cairocffi.ImageSurface.create_from_png(path)
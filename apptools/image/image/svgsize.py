@@ -0,0 +1,115 @@
+import re
+
+from functools import lru_cache
+from io import BytesIO
+from xml.etree.ElementTree import ParseError, iterparse
+
+# How cairosvg resolves lengths at its default of 96 dpi and 12pt text.
+_DPI = 96
+_FONT_SIZE = 16
+_UNITS = {
+    'mm': 1 / 25.4,
+    'cm': 1 / 2.54,
+    'in': 1,
+    'pt': 1 / 72.,
+    'pc': 1 / 6.,
+    'px': None,
+}
+_ROOT = re.compile(r'<svg\b[^>]*>')
+_SIZE = re.compile(r'\s(width|height)\s*=\s*("[^"]*"|\'[^\']*\')')
+
+
+@lru_cache(maxsize=64)
+def svg_size(filecontent, parent_width=None, parent_height=None):
+    """The size in pixels cairosvg renders an SVG at when its scale is 1,
+    without the need to parse the whole document (or cairosvg)."""
+    root = _root(filecontent)
+
+    width = _length(root.get('width', '100%'), parent_width or 0)
+    height = _length(root.get('height', '100%'), parent_height or 0)
+    viewbox = root.get('viewBox')
+    if viewbox:
+        viewbox = tuple(
+            float(position)
+            for position in re.sub('[ \n\r\t,]+', ' ', viewbox).split())
+        width = width or viewbox[2]
+        height = height or viewbox[3]
+    return width, height
+
+
+def pixels(filecontent, scale, size=None):
+    """The number of pixels of a render, 0 when the SVG cannot be read."""
+    parent_width, parent_height = None, None
+    if size is not None:
+        parent_width, parent_height = (float(part) for part in size.split("x"))
+
+    try:
+        width, height = svg_size(filecontent, parent_width, parent_height)
+    except (ParseError, ValueError, IndexError):
+        return 0
+    return int(width * scale) * int(height * scale)
+
+
+def resize(filecontent, size):
+    """The SVG at the size cairosvg renders it at with size, a 'WxH' string,
+    as its parent: a missing or percentage width or height of the root
+    element is set to its length in size."""
+    match = _ROOT.search(filecontent)
+    if match is None:
+        return filecontent
+
+    root = _root(filecontent)
+    if all(_absolute(root.get(name)) for name in ('width', 'height')):
+        return filecontent
+
+    parent_width, parent_height = (float(part) for part in size.split("x"))
+    width, height = svg_size(filecontent, parent_width, parent_height)
+    attributes = ' width="%g" height="%g"' % (width, height)
+
+    tag = _SIZE.sub('', match.group(0))
+    tag = tag[:4] + attributes + tag[4:]
+    return filecontent[:match.start()] + tag + filecontent[match.end():]
+
+
+def _absolute(length):
+    return bool(length) and not length.strip().endswith('%')
+
+
+def _root(filecontent):
+    for _, element in iterparse(BytesIO(bytes(filecontent, 'UTF-8')),
+                                events=('start', )):
+        return element
+    raise ParseError('no root element')
+
+
+def _length(string, reference):
+    if not string:
+        return 0
+
+    try:
+        return float(string)
+    except ValueError:
+        pass
+
+    string = _normalize(string).split(' ', 1)[0]
+    if string.endswith('%'):
+        return float(string[:-1]) * reference / 100
+    elif string.endswith('em'):
+        return _FONT_SIZE * float(string[:-2])
+    elif string.endswith('ex'):
+        return _FONT_SIZE * float(string[:-2]) / 2
+
+    for unit, coefficient in _UNITS.items():
+        if string.endswith(unit):
+            number = float(string[:-len(unit)])
+            return number * (_DPI * coefficient if coefficient else 1)
+
+    return 0
+
+
+def _normalize(string):
+    string = string.replace('E', 'e')
+    string = re.sub('(?<!e)-', ' -', string)
+    string = re.sub('[ \n\r\t,]+', ' ', string)
+    string = re.sub(r'(\.[0-9-]+)(?=\.)', r'\1 ', string)
+    return string.strip()
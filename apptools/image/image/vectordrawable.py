@@ -0,0 +1,485 @@
+import re
+
+from functools import lru_cache
+from xml.etree.ElementTree import ParseError, fromstring
+from xml.sax.saxutils import escape
+
+from apptools.image.image.svgsize import svg_size
+
+_SVG = '{http://www.w3.org/2000/svg}'
+
+# Presentation attributes passed on from a group to what is in it.
+_INHERITED = {
+    'fill': 'black',
+    'fill-opacity': '1',
+    'fill-rule': 'nonzero',
+    'stroke': 'none',
+    'stroke-width': '1',
+    'stroke-opacity': '1',
+    'stroke-linecap': 'butt',
+    'stroke-linejoin': 'miter',
+    'stroke-miterlimit': '4',
+}
+
+# Attributes a vector drawable has no counterpart for, unless at their default.
+_UNSUPPORTED = {
+    'clip-path': 'none',
+    'mask': 'none',
+    'filter': 'none',
+    'marker-start': 'none',
+    'marker-mid': 'none',
+    'marker-end': 'none',
+    'stroke-dasharray': 'none',
+    'visibility': 'visible',
+}
+
+_IGNORED = {'title', 'desc', 'metadata', 'defs', 'linearGradient',
+            'radialGradient', 'stop'}
+
+_COLORS = {
+    'black': '000000',
+    'silver': 'C0C0C0',
+    'gray': '808080',
+    'grey': '808080',
+    'white': 'FFFFFF',
+    'maroon': '800000',
+    'red': 'FF0000',
+    'purple': '800080',
+    'fuchsia': 'FF00FF',
+    'magenta': 'FF00FF',
+    'green': '008000',
+    'lime': '00FF00',
+    'olive': '808000',
+    'yellow': 'FFFF00',
+    'navy': '000080',
+    'blue': '0000FF',
+    'teal': '008080',
+    'aqua': '00FFFF',
+    'cyan': '00FFFF',
+    'orange': 'FFA500',
+}
+
+_TILE_MODES = {'pad': 'clamp', 'reflect': 'mirror', 'repeat': 'repeat'}
+
+
+class Unsupported(Exception):
+    """The SVG uses something a vector drawable cannot draw."""
+
+
+@lru_cache(maxsize=64)
+def vector_drawable(filecontent, size=None):
+    """The SVG as an Android vector drawable, for the paths, shapes, groups,
+    fills, strokes and gradients in user space it is made of. Raises
+    Unsupported for anything else."""
+    try:
+        root = fromstring(filecontent)
+    except ParseError as e:
+        raise Unsupported('cannot parse: %s' % e)
+
+    if root.tag != _SVG + 'svg':
+        raise Unsupported('not an SVG')
+
+    parent_width, parent_height = None, None
+    if size is not None:
+        parent_width, parent_height = (float(part) for part in size.split("x"))
+    try:
+        width, height = svg_size(filecontent, parent_width, parent_height)
+    except (ParseError, ValueError, IndexError):
+        raise Unsupported('unknown size')
+
+    viewbox = (0, 0, width, height)
+    if root.get('viewBox'):
+        viewbox = _numbers(root.get('viewBox'))
+        if len(viewbox) != 4:
+            raise Unsupported("viewBox '%s'" % root.get('viewBox'))
+    if not (width and height and viewbox[2] and viewbox[3]):
+        raise Unsupported('empty size')
+    if (abs(width / height - viewbox[2] / viewbox[3]) > 1e-3
+            and root.get('preserveAspectRatio', '').strip() != 'none'):
+        raise Unsupported('viewBox with another aspect ratio than the image')
+
+    converter = _Converter(_gradients(root))
+    translate = bool(viewbox[0] or viewbox[1])
+    try:
+        root_attributes = _attributes(root)
+        # The root has no group of its own to carry them.
+        if root_attributes.get('transform', '').strip():
+            raise Unsupported('transform on <svg>')
+        if float(root_attributes.get('opacity', '1')) != 1:
+            raise Unsupported('opacity on <svg>')
+        properties = _properties(root_attributes, _INHERITED, 'svg')
+        lines = converter.children(root, properties, 2 if translate else 1)
+    except (KeyError, ValueError) as e:
+        raise Unsupported('cannot convert: %s' % e)
+    if translate:
+        lines = _group({
+            'translateX': -viewbox[0],
+            'translateY': -viewbox[1]
+        }, lines, 1)
+
+    attributes = [
+        'xmlns:android="http://schemas.android.com/apk/res/android"',
+    ]
+    if converter.aapt:
+        attributes.append('xmlns:aapt="http://schemas.android.com/aapt"')
+    attributes += [
+        'android:width="%sdp"' % _format(width),
+        'android:height="%sdp"' % _format(height),
+        'android:viewportWidth="%s"' % _format(viewbox[2]),
+        'android:viewportHeight="%s"' % _format(viewbox[3]),
+    ]
+    return '<vector %s>\n%s</vector>\n' % ('\n    '.join(attributes),
+                                           ''.join(lines))
+
+
+class _Converter(object):
+    def __init__(self, gradients):
+        super().__init__()
+
+        self.gradients = gradients
+        # Whether a gradient is used, which needs the aapt namespace.
+        self.aapt = False
+
+    def children(self, element, inherited, depth):
+        lines = []
+        for child in element:
+            lines += self.element(child, inherited, depth)
+        return lines
+
+    def element(self, element, inherited, depth):
+        if not element.tag.startswith(_SVG):
+            # Elements of other namespaces, as editors add them, draw nothing.
+            return []
+
+        tag = element.tag[len(_SVG):]
+        if tag in _IGNORED:
+            return []
+
+        attributes = _attributes(element)
+        if attributes.get('display') == 'none':
+            return []
+        properties = _properties(attributes, inherited, tag)
+
+        # Every transform is a group of its own around the element.
+        transforms = _transforms(attributes.get('transform', ''))
+        inner = depth + len(transforms)
+        if tag == 'g':
+            if float(attributes.get('opacity', '1')) != 1:
+                raise Unsupported('opacity on <g>')
+            lines = self.children(element, properties, inner)
+        elif tag in _SHAPES:
+            path_data = _SHAPES[tag](element)
+            if not path_data:
+                return []
+            lines = self.path(path_data, properties,
+                              float(attributes.get('opacity', '1')), inner)
+        else:
+            raise Unsupported('<%s>' % tag)
+
+        for index in reversed(range(len(transforms))):
+            lines = _group(transforms[index], lines, depth + index)
+        return lines
+
+    def path(self, path_data, properties, opacity, depth):
+        attributes = {'pathData': path_data}
+        children = []
+
+        fill = properties['fill']
+        if fill != 'none':
+            self.paint(fill, 'fillColor', attributes, children, depth)
+            alpha = float(properties['fill-opacity']) * opacity
+            if alpha != 1:
+                attributes['fillAlpha'] = alpha
+            if properties['fill-rule'] == 'evenodd':
+                attributes['fillType'] = 'evenOdd'
+
+        stroke = properties['stroke']
+        if stroke != 'none':
+            self.paint(stroke, 'strokeColor', attributes, children, depth)
+            attributes['strokeWidth'] = _length(properties['stroke-width'])
+            alpha = float(properties['stroke-opacity']) * opacity
+            if alpha != 1:
+                attributes['strokeAlpha'] = alpha
+            if properties['stroke-linecap'] != 'butt':
+                attributes['strokeLineCap'] = properties['stroke-linecap']
+            if properties['stroke-linejoin'] != 'miter':
+                attributes['strokeLineJoin'] = properties['stroke-linejoin']
+            if properties['stroke-miterlimit'] != '4':
+                attributes['strokeMiterLimit'] = properties['stroke-miterlimit']
+
+        return _element('path', attributes, children, depth)
+
+    def paint(self, paint, name, attributes, children, depth):
+        match = re.match(r'url\(\s*#([^)\s]+)\s*\)', paint)
+        if match is None:
+            attributes[name] = _color(paint)
+            return
+
+        gradient = self.gradients.get(match.group(1))
+        if gradient is None:
+            raise Unsupported("paint '%s'" % paint)
+
+        self.aapt = True
+        gradient_attributes, stops = gradient
+        items = []
+        for offset, color in stops:
+            items += _element('item', {
+                'offset': offset,
+                'color': color
+            }, [], depth + 3)
+        children += ['    ' * (depth + 1) +
+                     '<aapt:attr name="android:%s">\n' % name]
+        children += _element('gradient', gradient_attributes, items,
+                             depth + 2)
+        children += ['    ' * (depth + 1) + '</aapt:attr>\n']
+
+
+def _gradients(root):
+    gradients = {}
+    for tag, kind in (('linearGradient', 'linear'), ('radialGradient',
+                                                      'radial')):
+        for element in root.iter(_SVG + tag):
+            if element.get('id') is None:
+                continue
+            try:
+                gradients[element.get('id')] = _gradient(element, kind)
+            except (Unsupported, KeyError, ValueError):
+                # Only a problem when it is used.
+                pass
+    return gradients
+
+
+def _gradient(element, kind):
+    if element.get('gradientUnits') != 'userSpaceOnUse':
+        raise Unsupported('gradient relative to the bounding box')
+    for name in ('gradientTransform', 'href',
+                 '{http://www.w3.org/1999/xlink}href', 'fx', 'fy'):
+        if element.get(name) is not None:
+            raise Unsupported("'%s' on a gradient" % name)
+
+    attributes = {
+        'type': kind,
+        'tileMode': _TILE_MODES[element.get('spreadMethod', 'pad')],
+    }
+    if kind == 'linear':
+        attributes.update(startX=_length(element.get('x1', '0')),
+                          startY=_length(element.get('y1', '0')),
+                          endX=_length(element.get('x2')),
+                          endY=_length(element.get('y2', '0')))
+    else:
+        attributes.update(centerX=_length(element.get('cx')),
+                          centerY=_length(element.get('cy')),
+                          gradientRadius=_length(element.get('r')))
+
+    stops = []
+    for stop in element.iter(_SVG + 'stop'):
+        stop_attributes = _attributes(stop)
+        offset = stop_attributes.get('offset', '0').strip()
+        if offset.endswith('%'):
+            offset = float(offset[:-1]) / 100
+        stops.append(
+            (min(max(float(offset), 0), 1),
+             _color(stop_attributes.get('stop-color', 'black'),
+                    float(stop_attributes.get('stop-opacity', '1')))))
+    if not stops:
+        raise Unsupported('gradient without stops')
+    return attributes, stops
+
+
+def _properties(attributes, inherited, tag):
+    for name, default in _UNSUPPORTED.items():
+        if attributes.get(name, default).strip() != default:
+            raise Unsupported("'%s' on <%s>" % (name, tag))
+
+    properties = dict(inherited)
+    properties.update((name, value.strip())
+                      for name, value in attributes.items()
+                      if name in _INHERITED and value.strip() != 'inherit')
+    return properties
+
+
+def _attributes(element):
+    # The style attribute wins over the attributes.
+    attributes = dict(element.attrib)
+    for declaration in attributes.pop('style', '').split(';'):
+        if ':' in declaration:
+            name, value = declaration.split(':', 1)
+            attributes[name.strip()] = value.strip()
+    return attributes
+
+
+def _color(color, opacity=1):
+    color = color.strip()
+    if color.lower() in _COLORS:
+        color = '#' + _COLORS[color.lower()]
+
+    alpha = opacity
+    if re.fullmatch(r'#[0-9a-fA-F]{3}', color):
+        rgb = ''.join(digit * 2 for digit in color[1:])
+    elif re.fullmatch(r'#[0-9a-fA-F]{6}', color):
+        rgb = color[1:]
+    else:
+        # rgb(r, g, b) and rgba(r, g, b, a), as colorizing writes them.
+        match = re.fullmatch(r'rgba?\(([^)]*)\)', color)
+        if match is None:
+            raise Unsupported("color '%s'" % color)
+        parts = [part.strip() for part in match.group(1).split(',')]
+        if len(parts) not in (3, 4):
+            raise Unsupported("color '%s'" % color)
+        rgb = ''.join('%02X' % _channel(part) for part in parts[:3])
+        if len(parts) == 4:
+            alpha *= float(parts[3])
+
+    return '#%02X%s' % (round(min(max(alpha, 0), 1) * 255), rgb.upper())
+
+
+def _channel(part):
+    if part.endswith('%'):
+        return round(min(max(float(part[:-1]), 0), 100) * 255 / 100)
+    return min(max(round(float(part)), 0), 255)
+
+
+def _transforms(transform):
+    """The transform list as the attributes of nested groups, outermost
+    first. A group applies its scale, rotation and translation in a fixed
+    order, so each gets a group of its own."""
+    groups = []
+    for name, arguments in re.findall(r'(\w+)\s*\(([^)]*)\)', transform):
+        numbers = _numbers(arguments)
+        if name == 'translate' and len(numbers) in (1, 2):
+            groups.append({
+                'translateX': numbers[0],
+                'translateY': numbers[1] if len(numbers) == 2 else 0
+            })
+        elif name == 'scale' and len(numbers) in (1, 2):
+            groups.append({
+                'scaleX': numbers[0],
+                'scaleY': numbers[-1]
+            })
+        elif name == 'rotate' and len(numbers) == 1:
+            groups.append({'rotation': numbers[0]})
+        elif name == 'rotate' and len(numbers) == 3:
+            groups.append({
+                'rotation': numbers[0],
+                'pivotX': numbers[1],
+                'pivotY': numbers[2]
+            })
+        else:
+            raise Unsupported("transform '%s(%s)'" % (name, arguments))
+    return groups
+
+
+def _group(attributes, lines, depth):
+    return _element('group', attributes, lines, depth)
+
+
+def _element(tag, attributes, children, depth):
+    indent = '    ' * depth
+    formatted = ''.join(
+        '\n%s    android:%s="%s"' % (indent, name, escape(_format(value)))
+        for name, value in attributes.items())
+    if not children:
+        return ['%s<%s%s />\n' % (indent, tag, formatted)]
+    return ['%s<%s%s>\n' % (indent, tag, formatted)
+            ] + children + ['%s</%s>\n' % (indent, tag)]
+
+
+def _format(value):
+    if isinstance(value, float):
+        return ('%.4f' % value).rstrip('0').rstrip('.')
+    return str(value)
+
+
+def _numbers(string):
+    return [
+        float(number) for number in re.findall(
+            r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', string)
+    ]
+
+
+def _length(string):
+    if string is None:
+        raise Unsupported('missing length')
+
+    string = string.strip()
+    if string.endswith('px'):
+        string = string[:-2]
+    try:
+        return float(string)
+    except ValueError:
+        raise Unsupported("length '%s'" % string)
+
+
+def _number(element, name):
+    return _length(element.get(name, '0'))
+
+
+def _path(element):
+    return ' '.join(element.get('d', '').split())
+
+
+def _rect(element):
+    x, y = _number(element, 'x'), _number(element, 'y')
+    width, height = _number(element, 'width'), _number(element, 'height')
+    if width <= 0 or height <= 0:
+        return None
+
+    # A missing radius is the same as the other one.
+    rx, ry = element.get('rx'), element.get('ry')
+    if rx is None:
+        rx = ry
+    if ry is None:
+        ry = rx
+    rx = min(_length(rx or '0'), width / 2)
+    ry = min(_length(ry or '0'), height / 2)
+    if not rx or not ry:
+        return 'M%s,%s h%s v%s h%s Z' % tuple(
+            _format(number) for number in (x, y, width, height, -width))
+
+    corner = '%s,%s 0 0 1' % (_format(rx), _format(ry))
+    horizontal, vertical = width - 2 * rx, height - 2 * ry
+    return ('M%s,%s h%s a{0} %s,%s v%s a{0} %s,%s h%s a{0} %s,%s v%s '
+            'a{0} %s,%s Z').format(corner) % tuple(
+                _format(number)
+                for number in (x + rx, y, horizontal, rx, ry, vertical, -rx,
+                               ry, -horizontal, -rx, -ry, -vertical, rx, -ry))
+
+
+def _ellipse(element, rx, ry):
+    cx, cy = _number(element, 'cx'), _number(element, 'cy')
+    if rx <= 0 or ry <= 0:
+        return None
+    return 'M%s,%s a%s,%s 0 1 0 %s,0 a%s,%s 0 1 0 %s,0 Z' % tuple(
+        _format(number)
+        for number in (cx - rx, cy, rx, ry, 2 * rx, rx, ry, -2 * rx))
+
+
+def _circle(element):
+    r = _number(element, 'r')
+    return _ellipse(element, r, r)
+
+
+def _line(element):
+    return 'M%s,%s L%s,%s' % tuple(
+        _format(_number(element, name)) for name in ('x1', 'y1', 'x2', 'y2'))
+
+
+def _poly(element, close):
+    numbers = _numbers(element.get('points', ''))
+    if len(numbers) < 4:
+        return None
+    points = ['%s,%s' % (_format(numbers[index]), _format(numbers[index + 1]))
+              for index in range(0, len(numbers) - 1, 2)]
+    return 'M' + ' L'.join(points) + (' Z' if close else '')
+
+
+_SHAPES = {
+    'path': _path,
+    'rect': _rect,
+    'circle': _circle,
+    'ellipse': lambda element: _ellipse(element, _number(element, 'rx'),
+                                        _number(element, 'ry')),
+    'line': _line,
+    'polyline': lambda element: _poly(element, False),
+    'polygon': lambda element: _poly(element, True),
+}
@@ -0,0 +1,75 @@
+from argparse import ArgumentTypeError
+from os import stat, walk
+from os.path import join
+from time import sleep
+
+from apptools.image.core.parser import spec as load_spec
+from apptools.image.image.distribute import distribute, pool
+
+
+def watch(spec, only_for_platform, overwrites, cache=None, max_workers=None,
+          memory=None, interval=0.5):
+    """Distribute the spec, and again every time the spec file or one of the
+    images changes until interrupted. The workers are started once and kept
+    between the runs, each run only renders what its changes touch."""
+    executor = pool(max_workers, {}, cache)
+    try:
+        snapshot = None
+        while True:
+            current = _settled(spec, interval)
+            if current != snapshot:
+                reload = snapshot is not None and current.get(
+                    spec.path) != snapshot.get(spec.path)
+                snapshot = current
+                if reload:
+                    try:
+                        spec = _reload(spec)
+                    except ArgumentTypeError as e:
+                        # Most likely saved halfway, the next save is picked
+                        # up again.
+                        print("Invalid spec, keeping the previous one: %s" %
+                              e)
+                        continue
+                    snapshot = _snapshot(spec)
+
+                distribute(spec, only_for_platform, overwrites, cache,
+                           max_workers, memory, executor=executor)
+                print("Watching '%s' for changes, stop with Ctrl-C" %
+                      spec.path)
+            sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _reload(spec):
+    print("Reload spec: '%s'" % spec.path)
+    return load_spec(spec.path)
+
+
+def _settled(spec, interval):
+    # An editor may write a file in several steps, wait for them to finish.
+    snapshot = _snapshot(spec)
+    while True:
+        sleep(interval / 5)
+        current = _snapshot(spec)
+        if current == snapshot:
+            return current
+        snapshot = current
+
+
+def _snapshot(spec):
+    """The modification time and size of the spec file and the images."""
+    snapshot = {}
+    paths = [spec.path]
+    for root, _, names in walk(join(spec.shared_path, 'images')):
+        paths.extend(join(root, name) for name in names)
+
+    for path in paths:
+        try:
+            status = stat(path)
+        except OSError:
+            continue
+        snapshot[path] = (status.st_mtime_ns, status.st_size)
+    return snapshot
@@ -15,6 +15,16 @@ def should_do_work_for_platform(image, platform, only_for_platform):
     return False
 
 
+def should_keep_vector(image, platform):
+    if not image.isSVG():
+        return False
+
+    if image.vector is not None:
+        return image.vector
+
+    return platform.vector
+
+
 def should_do_work_for_target(image, target):
     if image.targets is not None and target.name not in image.targets:
         return False
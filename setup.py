@@ -9,7 +9,7 @@ setuptools.setup(
     author="Dexelonian",
     author_email="info@dexels.com",
     packages=setuptools.find_packages(exclude=["test"]),
-    install_requires=["cairosvg~=2.5.1"],
+    install_requires=["cairosvg~=2.5.1", "cairocffi"],
     python_requires=">=3.7",
     entry_points="""
     [console_scripts]
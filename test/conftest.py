@@ -0,0 +1,111 @@
+import json
+import pathlib
+
+import pytest
+
+ENTITIES = {
+    "common/Base.xml": """<navascript>
+  <message name="Base">
+    <property name="Id" type="string" subtype="nullable=false"/>
+  </message>
+</navascript>
+""",
+    "member/Person.xml": """<navascript>
+  <message name="Person" extends="app/common/Base">
+    <property name="Name" type="string" subtype="nullable=false"/>
+  </message>
+</navascript>
+""",
+    "member/Team.xml": """<navascript>
+  <message name="Team">
+    <property name="TeamId" type="string"/>
+    <message name="Captain" extends="app/member/Person"/>
+  </message>
+</navascript>
+""",
+    "pets/Cat.xml": """<navascript>
+  <message name="Cat">
+    <property name="Lives" type="integer"/>
+  </message>
+</navascript>
+""",
+}
+
+
+@pytest.fixture
+def entities(tmp_path: pathlib.Path) -> pathlib.Path:
+    """An input directory of entities: Team uses Person, which extends Base,
+    and Cat stands on its own."""
+    input = tmp_path / "scripts" / "entities" / "app"
+    for name, content in ENTITIES.items():
+        path = input / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return input
+
+
+SPEC = {
+    "project": "test",
+    "shared": "shared",
+    "placeholder_colormap": {"primary": "#FF0000"},
+    "themes": [{
+        "name": "main",
+        "default_colorset": {"primary": "#123456"},
+        "custom_colorsets": [{"name": "dark", "colorset": {"primary": "#000000"}}],
+    }],
+    "platforms": [{
+        "name": "ios",
+        "repository": "ios",
+        "vector": True,
+        "scales": [{"multiplier": 1}, {"multiplier": 2}, {"multiplier": 3}],
+        "targets": [{"name": "main", "assets": "App/Assets.xcassets"}],
+    }, {
+        "name": "android",
+        "repository": "android",
+        "vector": True,
+        "scales": [
+            {"multiplier": 1, "directory": "drawable-mdpi"},
+            {"multiplier": 2, "directory": "drawable-xhdpi"},
+        ],
+        "targets": [{"name": "main", "assets": "app/src/main/res"}],
+    }],
+    "images": [
+        {"basename": "star.svg"},
+        {"basename": "star.svg", "style": "dark"},
+        {"basename": "dot.svg", "size": "48x48"},
+        {"basename": "photo.png"},
+    ],
+}
+
+IMAGES = {
+    "star.svg": '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">'
+                '<path fill="#FF0000" d="M0 0h20v20z"/></svg>',
+    "dot.svg": '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+               '<circle fill="#FF0000" cx="5" cy="5" r="4"/></svg>',
+    "photo.png": b'\x89PNG\r\n\x1a\n' + bytes(range(32)),
+}
+
+
+@pytest.fixture
+def project(tmp_path: pathlib.Path, monkeypatch) -> pathlib.Path:
+    """A spec with its images, whose SVGs are kept as vectors so nothing needs
+    to be rendered. The spec is in 'work', the current directory, next to
+    the platform repositories."""
+    spec = make_project(tmp_path)
+    monkeypatch.chdir(spec.parent)
+    return spec
+
+
+def make_project(directory: pathlib.Path) -> pathlib.Path:
+    images = directory / "shared" / "images"
+    images.mkdir(parents=True)
+    for name, content in IMAGES.items():
+        if isinstance(content, bytes):
+            (images / name).write_bytes(content)
+        else:
+            (images / name).write_text(content)
+
+    work = directory / "work"
+    work.mkdir()
+    (work / "spec.json").write_text(json.dumps(SPEC))
+    return work / "spec.json"
@@ -0,0 +1,102 @@
+from concurrent.futures import Future
+
+import pytest
+
+from apptools.image.image import distribute
+from apptools.image.image.distribute import run
+
+MB = 1024 * 1024
+
+
+class Task(object):
+    """An output that takes pixels to make, 4 bytes each."""
+
+    def __init__(self, name, pixels, result=True):
+        self.image = self.path = name
+        self.pixels = pixels
+        self.result = result
+
+    def make(self, cache):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class Executor(object):
+    """Keeps the tasks submitted running until wait() finishes one of them."""
+
+    def __init__(self):
+        self.submitted = []
+        self.running = []
+
+    def submit(self, fn, output):
+        self.submitted.append(output.path)
+        future = Future()
+        self.running.append((future, fn, output))
+        return future
+
+    def wait(self, futures, return_when):
+        # The smallest task is the first to be done, as renders are.
+        entry = min(self.running, key=lambda entry: entry[2].pixels)
+        self.running.remove(entry)
+        future, fn, output = entry
+        try:
+            future.set_result(fn(output))
+        except Exception as e:
+            future.set_exception(e)
+        return {future}, set()
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = Executor()
+    monkeypatch.setattr(distribute, 'wait', executor.wait)
+    return executor
+
+
+def test_tasks_start_in_order(executor):
+    tasks = [Task("a", 3 * MB), Task("b", 2 * MB), Task("c", MB)]
+
+    assert run(executor, tasks, 2, None) == []
+    assert executor.submitted == ["a", "b", "c"]
+
+
+def test_smaller_tasks_fill_the_memory_left(executor):
+    # a leaves room for the small ones, not for b.
+    tasks = [Task("a", 8 * MB), Task("b", 6 * MB), Task("c", MB), Task("d", MB)]
+
+    run(executor, tasks, 4, 40 * MB)
+
+    assert executor.submitted == ["a", "c", "d", "b"]
+
+
+def test_task_passed_by_as_many_as_workers_gets_the_memory_freed(executor):
+    # While a runs, b does not fit and the small ones keep taking the memory
+    # they free.
+    tasks = [Task("a", 7 * MB), Task("b", 5 * MB)] + [
+        Task("s%s" % index, MB) for index in range(1, 9)
+    ]
+
+    run(executor, tasks, 4, 40 * MB)
+
+    # After 4 small ones passed b, no other starts until it fits.
+    assert executor.submitted[:6] == ["a", "s1", "s2", "s3", "s4", "b"]
+
+
+def test_task_larger_than_the_memory_runs_alone(executor):
+    tasks = [Task("a", 20 * MB), Task("b", MB)]
+
+    run(executor, tasks, 4, 8 * MB)
+
+    assert executor.submitted == ["a", "b"]
+
+
+def test_failures_are_returned(executor):
+    error = OSError("disk full")
+    tasks = [Task("a", 3, False), Task("b", 2, error), Task("c", 1)]
+
+    failures = run(executor, tasks, 2, None)
+
+    assert sorted((output.path, reason) for output, reason in failures) == [
+        ("a", "failed"), ("b", error)
+    ]
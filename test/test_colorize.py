@@ -0,0 +1,28 @@
+import json
+
+from apptools.image.core.parser import spec as load_spec
+from apptools.image.image.colorize import colorize
+from apptools.image.image.distribute import distribute
+
+
+def test_colors_are_replaced_in_one_pass():
+    # A new color is not replaced again by a later one.
+    colormap = (("#FF0000", "#00FF00"), ("#00FF00", "#0000FF"))
+
+    assert colorize('<a fill="#FF0000" stroke="#00FF00"/>', colormap) == \
+        '<a fill="#00FF00" stroke="#0000FF"/>'
+
+
+def test_longer_colors_go_first():
+    colormap = (("#FFF", "#000"), ("#FFFFFF", "#111111"))
+
+    assert colorize('#FFFFFF #FFF', colormap) == '#111111 #000'
+
+
+def test_theme_without_a_color_is_a_broken_image(project):
+    spec = json.loads(project.read_text())
+    spec["themes"][0]["custom_colorsets"][0]["colorset"] = {"other": "#000000"}
+    project.write_text(json.dumps(spec))
+
+    assert not distribute(load_spec(str(project)), None, None, max_workers=2)
+    assert not (project.parent.parent / "ios").exists()
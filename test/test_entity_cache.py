@@ -0,0 +1,64 @@
+import pathlib
+
+from apptools.entity.writer import EntityCache, _api, _entities
+
+
+def _run(input: pathlib.Path, directory: pathlib.Path) -> EntityCache:
+    cache = EntityCache()
+    cache.load(directory, input)
+    _entities(input, _api(input), cache)
+    cache.save(directory, input)
+    return cache
+
+
+def _reused(input: pathlib.Path, directory: pathlib.Path) -> set:
+    cache = EntityCache()
+    cache.load(directory, input)
+    return {path.relative_to(input.resolve()).as_posix() for path in cache.entities}
+
+
+def test_unchanged_entities_are_reused(entities, tmp_path):
+    _run(entities, tmp_path / "cache")
+
+    assert _reused(entities, tmp_path / "cache") == {
+        "common/Base.xml", "member/Person.xml", "member/Team.xml", "pets/Cat.xml"
+    }
+
+
+def test_change_invalidates_the_entities_extending_it(entities, tmp_path):
+    _run(entities, tmp_path / "cache")
+
+    base = entities / "common" / "Base.xml"
+    base.write_text(base.read_text().replace('name="Id"', 'name="Key"'))
+
+    # Person extends Base and Team uses Person, so both depend on it.
+    assert _reused(entities, tmp_path / "cache") == {"pets/Cat.xml"}
+
+
+def test_change_leaves_the_entities_it_extends(entities, tmp_path):
+    _run(entities, tmp_path / "cache")
+
+    team = entities / "member" / "Team.xml"
+    team.write_text(team.read_text().replace('name="TeamId"', 'name="Code"'))
+
+    assert _reused(entities, tmp_path / "cache") == {
+        "common/Base.xml", "member/Person.xml", "pets/Cat.xml"
+    }
+
+
+def test_reused_entities_are_linked_to_the_current_ones(entities, tmp_path):
+    _run(entities, tmp_path / "cache")
+    cat = entities / "pets" / "Cat.xml"
+    cat.write_text(cat.read_text().replace('name="Lives"', 'name="Paws"'))
+
+    cache = _run(entities, tmp_path / "cache")
+
+    person = cache.entities[(entities / "member" / "Person.xml").resolve()]
+    base = cache.entities[(entities / "common" / "Base.xml").resolve()]
+    assert person.root.extends == [base]
+
+
+def test_cache_of_other_input_is_ignored(entities, tmp_path):
+    _run(entities, tmp_path / "cache")
+
+    assert _reused(entities / "member", tmp_path / "cache") == set()
@@ -0,0 +1,76 @@
+import pathlib
+
+from typing import List
+
+from apptools.entity.io import IndentedWriter
+from apptools.entity.navajo import Entity
+from apptools.entity.writer import Options, write
+
+# The entities the writer was called with, by the name of their file.
+written: List[str] = []
+
+
+def writer(entities: List[Entity], options: Options) -> int:
+    for entity in entities:
+        written.append(entity.name)
+        path = options["output"] / f"{entity.name}.txt"
+        with IndentedWriter(path) as fp:
+            fp.writeln(" ".join(property.name for property in entity.root.properties))
+    return 0
+
+
+def _write(input: pathlib.Path, output: pathlib.Path, **options) -> List[str]:
+    output.mkdir(parents=True, exist_ok=True)
+    written.clear()
+    write(writer, {"input": input, "output": output, "incremental": True, **options})
+    return sorted(written)
+
+
+def test_unchanged_entities_are_not_written_again(entities, tmp_path):
+    output = tmp_path / "output"
+
+    assert _write(entities, output) == ["Base", "Cat", "Person", "Team"]
+    assert _write(entities, output) == []
+
+
+def test_change_regenerates_the_entities_depending_on_it(entities, tmp_path):
+    output = tmp_path / "output"
+    _write(entities, output)
+
+    base = entities / "common" / "Base.xml"
+    base.write_text(base.read_text().replace('name="Id"', 'name="Key"'))
+
+    assert _write(entities, output) == ["Base", "Person", "Team"]
+
+
+def test_missing_output_regenerates_its_entity(entities, tmp_path):
+    output = tmp_path / "output"
+    _write(entities, output)
+
+    (output / "Cat.txt").unlink()
+
+    assert _write(entities, output) == ["Cat"]
+
+
+def test_other_settings_regenerate_everything(entities, tmp_path):
+    output = tmp_path / "output"
+    _write(entities, output)
+
+    assert _write(entities, output, force=True) == ["Base", "Cat", "Person", "Team"]
+
+
+def test_removed_entity_is_forgotten(entities, tmp_path):
+    output = tmp_path / "output"
+    _write(entities, output)
+
+    (entities / "pets" / "Cat.xml").unlink()
+    assert _write(entities, output) == []
+
+    # Back again, it is not taken for the one generated before.
+    (entities / "pets" / "Cat.xml").write_text("""<navascript>
+  <message name="Cat">
+    <property name="Lives" type="integer"/>
+  </message>
+</navascript>
+""")
+    assert _write(entities, output) == ["Cat"]
@@ -0,0 +1,44 @@
+import os
+
+from apptools.entity.io import IndentedWriter, recording, statistics
+
+
+def _write(path, text):
+    with IndentedWriter(path) as fp:
+        fp.writeln(text)
+
+
+def test_same_content_leaves_the_file_alone(tmp_path):
+    path = tmp_path / "A.kt"
+    _write(path, "class A")
+    os.utime(path, ns=(0, 0))
+
+    unchanged = statistics["unchanged"]
+    _write(path, "class A")
+
+    assert statistics["unchanged"] == unchanged + 1
+    assert path.stat().st_mtime_ns == 0
+
+
+def test_other_content_replaces_the_file_and_keeps_its_mode(tmp_path):
+    path = tmp_path / "A.kt"
+    _write(path, "class A")
+    path.chmod(0o600)
+
+    written = statistics["written"]
+    _write(path, "class B")
+
+    assert statistics["written"] == written + 1
+    assert path.read_text() == "class B\n"
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert [entry.name for entry in tmp_path.iterdir()] == ["A.kt"]
+
+
+def test_unchanged_files_are_recorded_as_well(tmp_path):
+    path = tmp_path / "A.kt"
+    _write(path, "class A")
+
+    with recording() as outputs:
+        _write(path, "class A")
+
+    assert outputs == [path]
@@ -0,0 +1,41 @@
+import pathlib
+
+import pytest
+
+from apptools.entity.writer import EntityCache, _api, _entities
+
+
+def test_cyclic_extends_fails(tmp_path: pathlib.Path):
+    input = tmp_path / "scripts" / "entities" / "app"
+    input.mkdir(parents=True)
+    (input / "A.xml").write_text(
+        '<navascript><message name="A" extends="app/B"/></navascript>\n')
+    (input / "B.xml").write_text(
+        '<navascript><message name="B" extends="app/A"/></navascript>\n')
+
+    with pytest.raises(ValueError, match="Cyclic extends: .*A.xml -> .*B.xml -> .*A.xml"):
+        _entities(input, _api(input), EntityCache())
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_entities_are_linked_to_the_same_parents(entities, jobs):
+    base, person, team, cat = _entities(entities, _api(entities), EntityCache(), jobs)
+
+    assert [entity.name for entity in (base, person, team, cat)] == [
+        "Base", "Person", "Team", "Cat"
+    ]
+    assert person.root.extends[0] is base
+    assert team.root.messages[0].extends[0] is person
+
+
+def test_parsing_in_parallel_gives_the_same_entities(entities):
+    def describe(entity):
+        return (entity.name, str(entity.path), str(entity.package),
+                [extends.name for extends in entity.root.extends])
+
+    sequential = _entities(entities, _api(entities), EntityCache(), 1)
+    parallel = _entities(entities, _api(entities), EntityCache(), 2)
+
+    assert [describe(entity) for entity in parallel] == [
+        describe(entity) for entity in sequential
+    ]
@@ -0,0 +1,83 @@
+import json
+import os
+
+from apptools.image.core.parser import spec as load_spec
+from apptools.image.image.distribute import distribute, prepare
+
+
+def _dirty(spec_path):
+    """The images of the files a run would make, by path."""
+    _, manifests, _, outputs = prepare(load_spec(str(spec_path)), None, None)
+    return {
+        output.path: output.image
+        for output in outputs if manifests[output.platform].is_dirty(output)
+    }
+
+
+def _outputs(spec_path):
+    _, _, _, outputs = prepare(load_spec(str(spec_path)), None, None)
+    return [(output.path, output.image) for output in outputs]
+
+
+def _distribute(spec_path):
+    return distribute(load_spec(str(spec_path)), None, None, max_workers=2)
+
+
+def test_unchanged_files_are_not_made_again(project):
+    everything = _dirty(project)
+    assert set(everything.values()) == {"star.svg", "dot.svg", "photo.png"}
+
+    assert _distribute(project)
+
+    assert all(os.path.exists(path) for path in everything)
+    assert _dirty(project) == {}
+
+
+def test_changed_image_makes_only_its_files(project):
+    _distribute(project)
+
+    star = project.parent.parent / "shared" / "images" / "star.svg"
+    star.write_text(star.read_text().replace("h20", "h10"))
+
+    dirty = _dirty(project)
+    assert dirty and set(dirty.values()) == {"star.svg"}
+    # Both the plain and the dark style, for both platforms.
+    assert any("star_dark" in path for path in dirty)
+    assert any("android" in path for path in dirty)
+    assert any("ios" in path for path in dirty)
+
+    assert _distribute(project)
+    assert _dirty(project) == {}
+
+
+def test_missing_file_is_made_again(project):
+    _distribute(project)
+    path = next(path for path, image in _outputs(project) if image == "photo.png")
+
+    os.remove(path)
+
+    assert _dirty(project) == {path: "photo.png"}
+
+
+def test_manifest_of_another_version_makes_everything(project):
+    _distribute(project)
+
+    manifest = project.parent.parent / "ios" / ".app-image-ios.json"
+    content = json.loads(manifest.read_text())
+    content["version"] = "0.0.0"
+    manifest.write_text(json.dumps(content))
+
+    ios = {path for path, _ in _outputs(project) if path.startswith("../ios/")}
+    assert ios and set(_dirty(project)) == ios
+
+
+def test_files_of_removed_images_are_removed(project):
+    _distribute(project)
+    photos = [path for path, image in _outputs(project) if image == "photo.png"]
+
+    spec = json.loads(project.read_text())
+    spec["images"] = [image for image in spec["images"] if image["basename"] != "photo.png"]
+    project.write_text(json.dumps(spec))
+
+    assert _distribute(project)
+    assert photos and not any(os.path.exists(path) for path in photos)
@@ -0,0 +1,66 @@
+import os
+
+from apptools.image.image.cache import RenderCache, materialize
+
+
+def _render(path, size=100):
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+def test_get_returns_what_was_put(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), 1000)
+    cache.put("abcdef", _render(tmp_path / "render.png"))
+
+    assert cache.contains("abcdef")
+    assert cache.get("abcdef", str(tmp_path / "copy.png"))
+    assert (tmp_path / "copy.png").read_bytes() == b'x' * 100
+
+
+def test_get_of_unknown_key_misses(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), 1000)
+
+    assert not cache.contains("abcdef")
+    assert not cache.get("abcdef", str(tmp_path / "copy.png"))
+    assert not (tmp_path / "copy.png").exists()
+
+
+def test_evict_removes_the_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), 250)
+    for time, key in enumerate(["aa1", "bb2", "cc3"]):
+        cache.put(key, _render(tmp_path / (key + ".png")))
+        os.utime(cache.path(key), (time, time))
+
+    # Getting a render makes it the most recently used.
+    cache.get("aa1", str(tmp_path / "copy.png"))
+    cache.evict()
+
+    assert cache.contains("aa1")
+    assert not cache.contains("bb2")
+    assert cache.contains("cc3")
+
+
+def test_evict_keeps_everything_within_the_size(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), 300)
+    for key in ["aa1", "bb2", "cc3"]:
+        cache.put(key, _render(tmp_path / (key + ".png")))
+
+    cache.evict()
+
+    assert all(cache.contains(key) for key in ["aa1", "bb2", "cc3"])
+
+
+def test_materialize_replaces_the_file_not_its_content(tmp_path):
+    source = _render(tmp_path / "source.png")
+    destination = tmp_path / "destination.png"
+    other = _render(tmp_path / "other.png", 10)
+    os.link(other, destination)
+
+    materialize(source, str(destination))
+
+    # The file linked to before is left alone, as is the directory.
+    assert destination.read_bytes() == b'x' * 100
+    assert (tmp_path / "other.png").read_bytes() == b'x' * 10
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == [
+        "destination.png", "other.png", "source.png"
+    ]
@@ -0,0 +1,66 @@
+import os
+
+from conftest import make_project
+
+from apptools.image.core.parser import spec as load_spec
+from apptools.image.image.distribute import distribute
+from apptools.image.image.merge import merge
+
+
+def _files(directory):
+    """The content of the files in the platform repositories, by their path."""
+    files = {}
+    for repository in ["ios", "android"]:
+        for root, _, names in os.walk(directory / repository):
+            for name in names:
+                path = os.path.join(root, name)
+                with open(path, 'rb') as fp:
+                    files[os.path.relpath(path, directory)] = fp.read()
+    return files
+
+
+def _distribute(directory, monkeypatch, **options):
+    spec = make_project(directory)
+    monkeypatch.chdir(spec.parent)
+    return distribute(load_spec(str(spec)), None, None, max_workers=2, **options)
+
+
+def _merge(directory, monkeypatch, shards):
+    spec = make_project(directory)
+    monkeypatch.chdir(spec.parent)
+    return merge(load_spec(str(spec)), None, None, [str(shard) for shard in shards])
+
+
+def test_merged_shards_are_a_full_run(tmp_path, monkeypatch):
+    assert _distribute(tmp_path / "full", monkeypatch)
+    shards = [tmp_path / "1", tmp_path / "2"]
+    for index, shard in enumerate(shards, 1):
+        assert _distribute(shard, monkeypatch, shard=(index, len(shards)))
+
+    assert _merge(tmp_path / "merged", monkeypatch, shards)
+
+    full = _files(tmp_path / "full")
+    assert any(path.endswith(".png") for path in full)
+    assert _files(tmp_path / "merged") == full
+
+
+def test_shards_divide_the_files(tmp_path, monkeypatch):
+    shards = [tmp_path / "1", tmp_path / "2"]
+    for index, shard in enumerate(shards, 1):
+        _distribute(shard, monkeypatch, shard=(index, len(shards)))
+
+    made = [
+        {path for path in _files(shard) if not os.path.basename(path).startswith(".")}
+        for shard in shards
+    ]
+    assert made[0] and made[1] and not made[0] & made[1]
+    # The Contents.json files need every shard, they are left to the merge.
+    assert not any(path.endswith("Contents.json") for path in made[0] | made[1])
+
+
+def test_merge_without_every_shard_fails(tmp_path, monkeypatch):
+    shards = [tmp_path / "1", tmp_path / "2"]
+    for index, shard in enumerate(shards, 1):
+        _distribute(shard, monkeypatch, shard=(index, len(shards)))
+
+    assert not _merge(tmp_path / "merged", monkeypatch, shards[:1])
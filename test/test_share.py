@@ -0,0 +1,38 @@
+from apptools.image.image.distribute import cost, share
+from apptools.image.image.output import Downscale, Render
+
+STAR = ('<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">'
+        '<path fill="%s" d="M0 0h20v20z"/></svg>')
+
+
+def _render(path, color, scale):
+    return Render("ios", "star.svg", path, STAR % color, "digest", {}, scale,
+                  None)
+
+
+def test_renders_of_one_svg_are_made_by_the_largest():
+    small = _render("star.png", "#FF0000", 1)
+    large = _render("star@3x.png", "#FF0000", 3)
+    medium = _render("star@2x.png", "#FF0000", 2)
+    other = _render("star_dark.png", "#000000", 1)
+
+    tasks = share([small, large, medium, other])
+
+    assert tasks == [large, other]
+    assert large.scales == [small, medium]
+    assert large.outputs() == [large, small, medium]
+    assert large.paths() == ["star@3x.png", "star.png", "star@2x.png"]
+    assert cost(large) == large.pixels + small.pixels + medium.pixels
+
+
+def test_downscales_are_made_by_their_master_in_the_group():
+    small = _render("star.png", "#FF0000", 1)
+    large = _render("star@3x.png", "#FF0000", 3)
+    downscale = Downscale("ios", "star.svg", "star-16.png", small, 16)
+
+    tasks = share([small, large, downscale])
+
+    assert tasks == [large]
+    assert small.derived == [downscale]
+    assert large.outputs() == [large, small, downscale]
+    assert "star-16.png" in large.paths()
@@ -0,0 +1,55 @@
+import pytest
+
+cairosvg = pytest.importorskip("cairosvg")
+
+from apptools.image.image.svg2png import _render  # noqa: E402
+
+PLAIN = """<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">
+  <path fill="#123456" d="M2 2h20v20z"/>
+</svg>"""
+
+PATTERN = """<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">
+  <defs>
+    <pattern id="dots" width="6" height="6" patternUnits="userSpaceOnUse">
+      <circle cx="3" cy="3" r="2" fill="#123456"/>
+    </pattern>
+  </defs>
+  <rect width="24" height="24" fill="url(#dots)"/>
+</svg>"""
+
+MASK = """<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">
+  <defs>
+    <mask id="hole">
+      <rect width="24" height="24" fill="white"/>
+      <circle cx="12" cy="12" r="6" fill="black"/>
+    </mask>
+  </defs>
+  <rect width="24" height="24" fill="#123456" mask="url(#hole)"/>
+</svg>"""
+
+
+@pytest.mark.parametrize("content", [PLAIN, PATTERN, MASK],
+                         ids=["plain", "pattern", "mask"])
+def test_render_is_what_cairosvg_renders(tmp_path, content):
+    # Every scale draws a copy of the same parsed tree, see _copy().
+    for scale in [1, 2, 3, 1]:
+        path = tmp_path / ("render@%sx.png" % scale)
+        expected = tmp_path / ("cairosvg@%sx.png" % scale)
+
+        _render(content, scale, str(path))
+        cairosvg.svg2png(bytestring=content.encode('UTF-8'), scale=scale,
+                         write_to=str(expected))
+
+        assert path.read_bytes() == expected.read_bytes()
+
+
+def test_render_at_a_size_is_what_cairosvg_renders(tmp_path):
+    path = tmp_path / "render.png"
+    expected = tmp_path / "cairosvg.png"
+
+    _render(PATTERN, 2, str(path), 48, 48)
+    cairosvg.svg2png(bytestring=PATTERN.encode('UTF-8'), scale=2,
+                     parent_width=48, parent_height=48,
+                     write_to=str(expected))
+
+    assert path.read_bytes() == expected.read_bytes()
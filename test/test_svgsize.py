@@ -0,0 +1,41 @@
+import pytest
+
+from apptools.image.image.svgsize import pixels, resize, svg_size
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" %s><path d="M0 0h1"/></svg>'
+
+
+@pytest.mark.parametrize("attributes, parent, size", [
+    ('width="24" height="12"', None, (24, 12)),
+    ('width="1in" height="72pt"', None, (96, 96)),
+    ('viewBox="0 0 30 20"', None, (30, 20)),
+    ('viewBox="0 0 30 20"', (48, 48), (48, 48)),
+    ('width="50%" height="100%" viewBox="0 0 30 20"', (48, 48), (24, 48)),
+])
+def test_size_is_that_of_cairosvg(attributes, parent, size):
+    assert svg_size(SVG % attributes, *(parent or ())) == size
+
+
+def test_pixels_of_unreadable_svg_are_0():
+    assert pixels('<svg', 1) == 0
+    assert pixels(SVG % 'width="10" height="10"', 2, "48x48") == 400
+
+
+def test_resize_keeps_absolute_dimensions():
+    svg = SVG % 'width="24" height="24"'
+
+    assert resize(svg, "48x48") == svg
+
+
+def test_resize_sets_missing_and_percentage_dimensions():
+    resized = resize(SVG % 'width="50%" viewBox="0 0 30 20"', "48x48")
+
+    assert svg_size(resized) == (24, 48)
+    assert 'viewBox="0 0 30 20"' in resized
+
+
+def test_resize_without_viewbox_leaves_the_content_as_is():
+    resized = resize(SVG % 'width="30"', "48x40")
+
+    assert svg_size(resized) == (30, 40)
+    assert 'viewBox' not in resized
@@ -0,0 +1,52 @@
+from xml.etree.ElementTree import fromstring
+
+import pytest
+
+from apptools.image.image.vectordrawable import Unsupported, vector_drawable
+
+ANDROID = '{http://schemas.android.com/apk/res/android}'
+
+
+def _svg(content, attributes='viewBox="0 0 10 10"'):
+    return '<svg xmlns="http://www.w3.org/2000/svg" %s>%s</svg>' % (attributes, content)
+
+
+def test_shapes_become_paths_at_the_size():
+    vector = fromstring(vector_drawable(_svg('<rect fill="#ff0000" width="4" height="4"/>'), "48x48"))
+
+    assert vector.get(ANDROID + 'width') == '48dp'
+    assert vector.get(ANDROID + 'viewportWidth') == '10'
+    path = vector.find('path')
+    assert path.get(ANDROID + 'pathData') == 'M0,0 h4 v4 h-4 Z'
+    assert path.get(ANDROID + 'fillColor') == '#FFFF0000'
+
+
+def test_transforms_become_groups():
+    vector = fromstring(vector_drawable(_svg(
+        '<g transform="translate(1 2)"><circle cx="1" cy="1" r="1"/></g>')))
+
+    group = vector.find('group')
+    assert group.get(ANDROID + 'translateX') == '1'
+    assert group.get(ANDROID + 'translateY') == '2'
+    assert group.find('path') is not None
+
+
+def test_opacity_multiplies_with_the_fill_opacity():
+    vector = fromstring(vector_drawable(_svg(
+        '<rect fill="red" fill-opacity="0.5" opacity="0.5" width="1" height="1"/>')))
+
+    assert float(vector.find('path').get(ANDROID + 'fillAlpha')) == 0.25
+
+
+@pytest.mark.parametrize("svg", [
+    _svg('<text>A</text>'),
+    _svg('<rect width="1" height="1" mask="url(#m)"/>'),
+    _svg('<g opacity="0.5"><rect width="1" height="1"/></g>'),
+    _svg('<rect width="1" height="1"/>', 'viewBox="0 0 10 10" opacity="0.5"'),
+    _svg('<rect width="1" height="1"/>', 'viewBox="0 0 10 10" style="opacity: 0.5"'),
+    _svg('<rect width="1" height="1"/>', 'viewBox="0 0 10 10" transform="scale(2)"'),
+    _svg('<rect width="1" height="1"/>', 'width="10" height="20" viewBox="0 0 10 10"'),
+])
+def test_what_a_vector_drawable_cannot_draw_is_unsupported(svg):
+    with pytest.raises(Unsupported):
+        vector_drawable(svg)